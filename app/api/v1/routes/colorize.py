@@ -1,22 +1,53 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Header
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Header, Query, Response
 from fastapi.responses import JSONResponse
+import os
 import uuid
 import asyncio
-from datetime import datetime
-from typing import Optional
+import base64
+import binascii
+import math
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple, Union
 import json
 
-from app.core.google_ai_client import ImageColorizer
+from app.core.google_ai_client import ModelUnavailableError
+from app.core.model_router import model_router, PriorityClass
 from app.services.storage_service import StorageService
 from app.models.colorize import ColorizeRequest, ColorizeResponse, ColorizeStatus
-from app.models.colorize import ColorizeEphemeralResponse
-from app.db.supabase_db import get_supabase_client, safe_supabase_operation
-from user_agents import parse as parse_ua
+from app.models.colorize import ColorizeEphemeralResponse, ColorizeHistoryItem, ColorizeHistoryResponse
+from app.models.colorize import ColorizeUploadUrlResponse
+from app.db.supabase_db import get_supabase_client, safe_supabase_operation, run_supabase_async, or_filter, order_by
+from app.services.admission import admission_controller, estimate_upload_cost, estimate_file_cost, get_upload_size
+from app.services.admission import probe_image_dimensions
+from app.services.image_variants import generate_variants
+from app.services.task_registry import task_registry
+from app.config.settings import STALE_PROCESSING_SECONDS, STALE_REQUEST_MAX_AGE_SECONDS, RECOVERY_SWEEP_INTERVAL_SECONDS
+from app.config.settings import STALE_QUEUED_SECONDS
+from app.config.settings import COLORIZE_MAX_CONCURRENT_JOBS, MODEL_THROTTLE_COOLDOWN_SECONDS, STATUS_CACHE_MAX_AGE_SECONDS
+from app.utils.logger import log_info, log_warning
+from app.utils.user_agent import detect_platform
 
 router = APIRouter()
-colorizer = ImageColorizer()
+
+# Only what a gallery grid needs; full details come from /status
+HISTORY_COLUMNS = "id,status,original_url,colorized_url,original_thumbnail_url,colorized_thumbnail_url,created_at,completed_at"
+
+# Cheap to construct; the Gemini models and the Supabase client behind
+# them are created on first use (or by warm_up_clients)
 storage_service = StorageService()
 
+# Colorizations running at once in this worker; queued jobs wait here
+# holding nothing but a storage path
+job_slots = asyncio.Semaphore(COLORIZE_MAX_CONCURRENT_JOBS)
+
+def warm_up_clients():
+    """
+    Build the Gemini and Supabase clients ahead of the first request.
+    Blocking; run it in an executor.
+    """
+    model_router.warm_up()
+    get_supabase_client()
+
 @router.post("/upload", response_model=ColorizeResponse)
 async def upload_image(
     file: UploadFile = File(...),
@@ -38,6 +69,13 @@ async def upload_image(
     if not content_type or not content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
+    # Refuse new work once the worker is shutting down
+    task_registry.ensure_accepting()
+    
+    # The request only holds the upload while proxying it to storage (file
+    # bytes plus the outgoing request body); the job reserves its own memory
+    reservation = admission_controller.try_acquire(2 * get_upload_size(file))
+    
     try:
         # Create a unique request ID
         request_id = str(uuid.uuid4())
@@ -57,7 +95,7 @@ async def upload_image(
         # Create initial response
         response = ColorizeResponse(
             request_id=request_id,
-            status=ColorizeStatus.PROCESSING,
+            status=ColorizeStatus.QUEUED,
             original_url=original_url,
             created_at=datetime.utcnow()
         )
@@ -68,10 +106,11 @@ async def upload_image(
                 "id": request_id,
                 "user_id": user_id,
                 "user_email": user_email,
-                "status": ColorizeStatus.PROCESSING.value,
+                "status": ColorizeStatus.QUEUED.value,
                 "original_path": original_path,
                 "original_url": original_url,
-                "created_at": response.created_at.isoformat()
+                "created_at": response.created_at.isoformat(),
+                "queued_at": response.created_at.isoformat()
             }).execute()
         
         await safe_supabase_operation(
@@ -79,19 +118,143 @@ async def upload_image(
             error_message="Failed to store colorize request"
         )
         
-        # Start colorization in background
-        asyncio.create_task(process_colorization(request_id, user_id, file_content, original_path))
+        # Start colorization in background; tracked so shutdown can drain it.
+        # The job only gets the storage path, not the bytes.
+        task_registry.spawn(
+            request_id,
+            process_colorization(request_id, user_id, original_path)
+        )
         
         return response
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process image: {str(e)}")
+    
+    finally:
+        reservation.release()
+
+@router.post("/upload-url", response_model=ColorizeUploadUrlResponse)
+async def create_upload_url(
+    user_id: str = Form(...),
+    user_email: Optional[str] = Form(None),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Start a direct-to-storage upload
+    
+    Returns a signed URL the client uploads the original image to, so the
+    image never passes through the API. Colorization starts once the client
+    calls `/upload/{request_id}/complete`.
+    
+    Args:
+        user_id: The ID of the user
+        user_email: Optional email of the user for organization
+        authorization: JWT token for authentication
+    """
+    task_registry.ensure_accepting()
+    
+    try:
+        request_id = str(uuid.uuid4())
+        
+        signed = await storage_service.create_original_upload_url(user_id)
+        original_path = signed["path"]
+        original_url = await storage_service.get_public_url(
+            storage_service.BUCKET_ORIGINAL,
+            original_path
+        )
+        
+        def store_request():
+            return get_supabase_client().table("colorize_requests").insert({
+                "id": request_id,
+                "user_id": user_id,
+                "user_email": user_email,
+                "status": ColorizeStatus.AWAITING_UPLOAD.value,
+                "original_path": original_path,
+                "original_url": original_url,
+                "created_at": datetime.utcnow().isoformat()
+            }).execute()
+        
+        await safe_supabase_operation(
+            store_request,
+            error_message="Failed to store colorize request"
+        )
+        
+        return ColorizeUploadUrlResponse(
+            request_id=request_id,
+            upload_url=signed["signed_url"],
+            token=signed["token"],
+            path=original_path,
+            expires_in=storage_service.SIGNED_UPLOAD_EXPIRES_IN
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload URL: {str(e)}")
+
+@router.post("/upload/{request_id}/complete", response_model=ColorizeResponse)
+async def complete_upload(request_id: str):
+    """
+    Start colorization of an image uploaded through `/upload-url`
+    
+    Checks that a non-empty image is in storage, then queues the job with
+    only its storage path.
+    
+    Args:
+        request_id: The ID returned by `/upload-url`
+    """
+    task_registry.ensure_accepting()
+    
+    def get_request():
+        return get_supabase_client().table("colorize_requests") \
+            .select("id,user_id,status,original_path,original_url,created_at") \
+            .eq("id", request_id) \
+            .execute()
+    
+    result = await safe_supabase_operation(
+        get_request,
+        error_message="Failed to get colorize request"
+    )
+    if not result.data:
+        raise HTTPException(status_code=404, detail=f"Request with ID {request_id} not found")
+    
+    request_data = result.data[0]
+    if request_data["status"] != ColorizeStatus.AWAITING_UPLOAD.value:
+        raise HTTPException(status_code=409, detail=f"Request is already {request_data['status']}")
+    
+    original = await storage_service.get_original_image_info(request_data["original_path"])
+    if original is None:
+        raise HTTPException(status_code=409, detail="The image has not been uploaded yet")
+    # Same checks /upload applies before storing anything
+    if original["size"] == 0:
+        raise HTTPException(status_code=400, detail="The uploaded file is empty")
+    if not original["mimetype"].startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    
+    # Only one completion call may queue the job
+    if not await claim_request(request_id, ColorizeStatus.AWAITING_UPLOAD, ColorizeStatus.QUEUED):
+        raise HTTPException(status_code=409, detail="Request is already being processed")
+    
+    task_registry.spawn(
+        request_id,
+        process_colorization(request_id, request_data["user_id"], request_data["original_path"])
+    )
+    
+    return ColorizeResponse(
+        request_id=request_id,
+        status=ColorizeStatus.QUEUED,
+        original_url=request_data.get("original_url"),
+        created_at=datetime.fromisoformat(request_data["created_at"])
+    )
 
 @router.get("/status/{request_id}", response_model=ColorizeResponse)
-async def get_status(request_id: str):
+async def get_status(request_id: str, response: Response):
     """
     Get the status of a colorization request
     
+    Finished requests don't change any more, so clients may reuse their
+    response for a while; anything still in progress must be re-polled.
+    
     Args:
         request_id: The ID of the request to check
     """
@@ -110,12 +273,21 @@ async def get_status(request_id: str):
         
         request_data = result.data[0]
         
+        if request_data["status"] in (ColorizeStatus.COMPLETE, ColorizeStatus.FAILED):
+            response.headers["Cache-Control"] = f"private, max-age={STATUS_CACHE_MAX_AGE_SECONDS}"
+        else:
+            response.headers["Cache-Control"] = "no-store"
+        
         # Convert to response model
         return ColorizeResponse(
             request_id=request_data["id"],
             status=request_data["status"],
             original_url=request_data.get("original_url"),
             colorized_url=request_data.get("colorized_url"),
+            original_thumbnail_url=request_data.get("original_thumbnail_url"),
+            original_preview_url=request_data.get("original_preview_url"),
+            colorized_thumbnail_url=request_data.get("colorized_thumbnail_url"),
+            colorized_preview_url=request_data.get("colorized_preview_url"),
             error_message=request_data.get("error_message"),
             created_at=datetime.fromisoformat(request_data["created_at"]),
             completed_at=datetime.fromisoformat(request_data["completed_at"]) if request_data.get("completed_at") else None
@@ -126,19 +298,235 @@ async def get_status(request_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get request status: {str(e)}")
 
-async def process_colorization(request_id: str, user_id: str, image_bytes: bytes, original_path: str):
+async def get_authenticated_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    Resolve the caller from their Supabase access token
+
+    Args:
+        authorization: `Bearer <access token>` header
+
+    Returns:
+        str: The verified user ID
     """
-    Process an image colorization in the background
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    token = authorization.split(" ", 1)[1]
+    
+    try:
+        # Verify token with Supabase - this validates the signature and expiry
+        user_response = await run_supabase_async(lambda: get_supabase_client().auth.get_user(token))
+    except Exception:
+        user_response = None
+    if not user_response or not user_response.user:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user_response.user.id
+
+def encode_history_cursor(created_at: str, request_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{request_id}".encode()).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, request_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(request_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/history", response_model=ColorizeHistoryResponse, response_model_exclude_none=True)
+async def get_history(
+    user_id: str = Depends(get_authenticated_user_id),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of items to return"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    status: Optional[List[ColorizeStatus]] = Query(None, description="Only include these statuses")
+):
+    """
+    List the caller's colorization requests, newest first
+    
+    Uses keyset pagination on (user_id, created_at, id): each page continues
+    strictly after the last (created_at, id) seen, so every page costs the
+    same index range scan no matter how deep the user pages, and requests
+    created in the same instant are neither skipped nor repeated.
+    
+    Args:
+        user_id: The verified ID of the caller, from the bearer token
+        limit: Page size
+        cursor: Opaque cursor returned by the previous page
+        status: Optional status filter, may be repeated
+    """
+    after = decode_history_cursor(cursor) if cursor else None
+    
+    try:
+        def get_requests():
+            query = get_supabase_client().table("colorize_requests") \
+                .select(HISTORY_COLUMNS) \
+                .eq("user_id", user_id)
+            if status:
+                query = query.in_("status", [s.value for s in status])
+            if after:
+                # (created_at, id) < (last created_at, last id)
+                created_at, request_id = after
+                query = or_filter(
+                    query,
+                    f'created_at.lt."{created_at}"',
+                    f'and(created_at.eq."{created_at}",id.lt.{request_id})',
+                )
+            # One extra row tells us whether another page exists
+            return order_by(query, "created_at.desc", "id.desc").limit(limit + 1).execute()
+        
+        result = await safe_supabase_operation(
+            get_requests,
+            error_message="Failed to get colorize history"
+        )
+        
+        rows = result.data or []
+        page = rows[:limit]
+        next_cursor = encode_history_cursor(page[-1]["created_at"], page[-1]["id"]) if len(rows) > limit else None
+        
+        return ColorizeHistoryResponse(
+            items=[
+                ColorizeHistoryItem(
+                    request_id=row["id"],
+                    status=row["status"],
+                    original_url=row.get("original_url"),
+                    colorized_url=row.get("colorized_url"),
+                    original_thumbnail_url=row.get("original_thumbnail_url"),
+                    colorized_thumbnail_url=row.get("colorized_thumbnail_url"),
+                    created_at=datetime.fromisoformat(row["created_at"]),
+                    completed_at=datetime.fromisoformat(row["completed_at"]) if row.get("completed_at") else None
+                )
+                for row in page
+            ],
+            next_cursor=next_cursor
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get history: {str(e)}")
+
+async def claim_request(
+    request_id: str,
+    expected_status: ColorizeStatus,
+    new_status: ColorizeStatus,
+    expected_started_at: Optional[str] = None
+) -> bool:
+    """
+    Move a request to a new status only if it is still in the expected one
+    
+    The conditional update makes the transition safe across workers: exactly
+    one caller sees it succeed.
+    
+    Args:
+        request_id: The ID of the request
+        expected_status: Status the request must currently have
+        new_status: Status to move it to
+        expected_started_at: If set, `started_at` must also still match
+        
+    Returns:
+        bool: Whether this caller made the transition
+    """
+    changes = {"status": new_status.value}
+    if new_status == ColorizeStatus.PROCESSING:
+        changes["started_at"] = datetime.utcnow().isoformat()
+    elif new_status == ColorizeStatus.QUEUED:
+        changes["queued_at"] = datetime.utcnow().isoformat()
+    
+    def claim():
+        query = get_supabase_client().table("colorize_requests") \
+            .update(changes) \
+            .eq("id", request_id) \
+            .eq("status", expected_status.value)
+        if expected_started_at:
+            query = query.eq("started_at", expected_started_at)
+        return query.execute()
+    
+    result = await safe_supabase_operation(
+        claim,
+        error_message="Failed to update colorize request status"
+    )
+    return bool(result.data)
+
+async def is_request_queued(request_id: str) -> bool:
+    """
+    Whether a request is still `queued`, i.e. no other worker has claimed it
+    
+    Args:
+        request_id: The ID of the request
+    """
+    def get_status():
+        return get_supabase_client().table("colorize_requests") \
+            .select("status") \
+            .eq("id", request_id) \
+            .execute()
+    
+    result = await safe_supabase_operation(
+        get_status,
+        error_message="Failed to get colorize request status"
+    )
+    return bool(result.data) and result.data[0]["status"] == ColorizeStatus.QUEUED.value
+
+async def process_colorization(request_id: str, user_id: str, original_path: str):
+    """
+    Process a queued image colorization in the background
+    
+    The job holds only the storage path until one of the worker's job slots
+    is free. It then spools the original from storage to a local temp file
+    and waits for memory for the actual image, so a deep backlog costs next
+    to no memory. The request is only claimed (and `started_at` set) once
+    the memory is granted, so a long wait never looks like a stalled job.
+    A job whose request was claimed elsewhere while it waited for its slot
+    stops before downloading anything.
     
     Args:
         request_id: The unique ID for this request
         user_id: The ID of the user
-        image_bytes: The binary content of the original image
         original_path: The path to the original image in storage
     """
+    async with job_slots:
+        spool_path = None
+        reservation = None
+        try:
+            if not await is_request_queued(request_id):
+                return
+            
+            dimensions = None
+            try:
+                spool_path = await storage_service.download_original_to_spool(original_path)
+                with open(spool_path, "rb") as spool:
+                    dimensions = probe_image_dimensions(spool)
+                reservation = await admission_controller.acquire(estimate_file_cost(spool_path, dimensions))
+            except Exception as e:
+                log_warning(f"Failed to spool original for {request_id}: {str(e)}")
+            
+            # Another worker's recovery sweep may have picked the request up first
+            if not await claim_request(request_id, ColorizeStatus.QUEUED, ColorizeStatus.PROCESSING):
+                return
+            
+            if not reservation:
+                await mark_request_failed(request_id, "The original image is no longer available. Please upload it again.")
+                return
+            await _run_colorization(request_id, user_id, original_path, spool_path, dimensions)
+        
+        finally:
+            if reservation:
+                reservation.release()
+            if spool_path:
+                try:
+                    os.remove(spool_path)
+                except OSError:
+                    pass
+
+async def _run_colorization(
+    request_id: str,
+    user_id: str,
+    original_path: str,
+    spool_path: str,
+    dimensions: Optional[Tuple[int, int]]
+):
     try:
         # Process the image using Google AI
-        colorized_image_bytes = await colorizer.colorize_image(image_bytes)
+        colorized_image_bytes = await model_router.colorize(spool_path, PriorityClass.BATCH, dimensions)
         
         # Upload the colorized image
         colorized_path = await storage_service.upload_colorized_image(
@@ -150,12 +538,21 @@ async def process_colorization(request_id: str, user_id: str, image_bytes: bytes
         # Get the public URLs
         original_url, colorized_url = await storage_service.get_image_urls(original_path, colorized_path)
         
+        # Gallery thumbnails and previews of both images
+        variant_urls = await store_image_variants(
+            spool_path,
+            original_path,
+            colorized_image_bytes,
+            colorized_path
+        )
+        
         # Update the status in the database
         def update_status():
             return get_supabase_client().table("colorize_requests").update({
                 "status": ColorizeStatus.COMPLETE.value,
                 "colorized_path": colorized_path,
                 "colorized_url": colorized_url,
+                **variant_urls,
                 "completed_at": datetime.utcnow().isoformat()
             }).eq("id", request_id).execute()
         
@@ -164,38 +561,215 @@ async def process_colorization(request_id: str, user_id: str, image_bytes: bytes
             error_message="Failed to update colorize request status"
         )
     
+    except ModelUnavailableError as e:
+        # Every model is throttled or down for now; the recovery sweep picks
+        # the request up again after the cooldown (until it is too old)
+        log_warning(f"Requeueing {request_id}: {str(e)}")
+        await claim_request(request_id, ColorizeStatus.PROCESSING, ColorizeStatus.QUEUED)
+    
     except Exception as e:
-        error_message = str(e)
+        await mark_request_failed(request_id, str(e))
+
+async def mark_request_failed(request_id: str, error_message: str):
+    """
+    Record a colorization request as failed
+    
+    Args:
+        request_id: The ID of the request
+        error_message: Message shown to the user
+    """
+    def update_failed_status():
+        return get_supabase_client().table("colorize_requests").update({
+            "status": ColorizeStatus.FAILED.value,
+            "error_message": error_message,
+            "completed_at": datetime.utcnow().isoformat()
+        }).eq("id", request_id).execute()
+    
+    await safe_supabase_operation(
+        update_failed_status,
+        error_message="Failed to update colorize request status"
+    )
+
+async def requeue_interrupted_requests(request_ids: List[str]):
+    """
+    Park requests whose processing was cut short by shutdown so that a
+    worker resumes them on its next recovery sweep
+    
+    Args:
+        request_ids: IDs of the interrupted requests
+    """
+    if not request_ids:
+        return
+    
+    def mark_queued():
+        return get_supabase_client().table("colorize_requests").update({
+            "status": ColorizeStatus.QUEUED.value,
+            "queued_at": datetime.utcnow().isoformat()
+        }).in_("id", request_ids).eq("status", ColorizeStatus.PROCESSING.value).execute()
+    
+    await safe_supabase_operation(
+        mark_queued,
+        error_message="Failed to requeue interrupted colorize requests"
+    )
+    log_info(f"Requeued {len(request_ids)} interrupted colorize requests")
+
+def _as_naive_utc(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+async def sweep_stale_requests(limit: int = 50) -> int:
+    """
+    Pick up requests left `queued` for STALE_QUEUED_SECONDS (requeued on
+    shutdown or while every model was busy, or queued by a worker that
+    died), and requeue `processing` requests whose worker died without
+    finishing (no progress for STALE_PROCESSING_SECONDS). Requests older than
+    STALE_REQUEST_MAX_AGE_SECONDS, or without a stored original, are failed
+    instead, as are direct uploads whose signed URL expired before the
+    client completed them.
+    
+    Several workers may queue the same request; the job's claim when it gets
+    a slot ensures only one of them processes it.
+    
+    Args:
+        limit: Maximum rows of each kind to look at per sweep
         
-        # Update the status to failed
-        def update_failed_status():
-            return get_supabase_client().table("colorize_requests").update({
-                "status": ColorizeStatus.FAILED.value,
-                "error_message": error_message,
-                "completed_at": datetime.utcnow().isoformat()
-            }).eq("id", request_id).execute()
+    Returns:
+        int: Number of requests picked up
+    """
+    now = datetime.utcnow()
+    stale_before = (now - timedelta(seconds=STALE_PROCESSING_SECONDS)).isoformat()
+    # Newer queued requests are still held by the worker that queued them
+    queued_before = (now - timedelta(seconds=STALE_QUEUED_SECONDS)).isoformat()
+    expire_before = now - timedelta(seconds=STALE_REQUEST_MAX_AGE_SECONDS)
+    columns = "id,user_id,status,original_path,created_at,started_at"
+    
+    def get_queued():
+        query = get_supabase_client().table("colorize_requests") \
+            .select(columns) \
+            .eq("status", ColorizeStatus.QUEUED.value)
+        # Rows queued before queued_at existed are judged by created_at
+        query = or_filter(
+            query,
+            f'queued_at.lt."{queued_before}"',
+            f'and(queued_at.is.null,created_at.lt."{queued_before}")',
+        )
+        return query.order("created_at").limit(limit).execute()
+    
+    def get_stale():
+        query = get_supabase_client().table("colorize_requests") \
+            .select(columns) \
+            .eq("status", ColorizeStatus.PROCESSING.value)
+        # Rows left in `processing` before started_at existed have it unset;
+        # judge those by when they were created
+        query = or_filter(
+            query,
+            f'started_at.lt."{stale_before}"',
+            f'and(started_at.is.null,created_at.lt."{stale_before}")',
+        )
+        return query.limit(limit).execute()
+    
+    def expire_abandoned_uploads():
+        abandoned_before = now - timedelta(seconds=storage_service.SIGNED_UPLOAD_EXPIRES_IN)
+        return get_supabase_client().table("colorize_requests").update({
+            "status": ColorizeStatus.FAILED.value,
+            "error_message": "The image upload was never completed.",
+            "completed_at": now.isoformat()
+        }).eq("status", ColorizeStatus.AWAITING_UPLOAD.value).lt("created_at", abandoned_before.isoformat()).execute()
+    
+    await safe_supabase_operation(expire_abandoned_uploads, error_message="Failed to expire abandoned uploads")
+    queued = await safe_supabase_operation(get_queued, error_message="Failed to list queued colorize requests")
+    stale = await safe_supabase_operation(get_stale, error_message="Failed to list stale colorize requests")
+    
+    resumed = 0
+    for row in (queued.data or []) + (stale.data or []):
+        if not row.get("original_path") or _as_naive_utc(row["created_at"]) < expire_before:
+            await mark_request_failed(row["id"], "Processing was interrupted. Please upload the image again.")
+            continue
         
-        await safe_supabase_operation(
-            update_failed_status,
-            error_message="Failed to update colorize request status"
+        if not task_registry.accepting:
+            break
+        if task_registry.is_tracking(row["id"]):
+            # Already waiting for a slot in this worker
+            continue
+        
+        if row["status"] == ColorizeStatus.PROCESSING.value:
+            requeued = await claim_request(
+                row["id"],
+                ColorizeStatus.PROCESSING,
+                ColorizeStatus.QUEUED,
+                expected_started_at=row["started_at"]
+            )
+            if not requeued:
+                # Another worker got there first
+                continue
+        
+        task_registry.spawn(
+            row["id"],
+            process_colorization(row["id"], row["user_id"], row["original_path"])
         )
+        resumed += 1
+    
+    return resumed
 
-def detect_platform(ua: str) -> str:
-    if not ua:
-        return "unknown"
-    ua_parsed = parse_ua(ua)
-    if ua_parsed.is_mobile:
-        if ua_parsed.os.family.lower().startswith("android"):
-            return "android"
-        return "ios"
-    if ua_parsed.os.family.lower().startswith("mac"):
-        return "macos"
-    if ua_parsed.os.family.lower().startswith("windows"):
-        return "windows"
-    return "desktop"
+async def run_recovery_sweeper():
+    """
+    Periodically resume interrupted colorizations; runs for the worker's lifetime
+    """
+    while True:
+        try:
+            resumed = await sweep_stale_requests()
+            if resumed:
+                log_info(f"Resumed {resumed} interrupted colorize requests")
+        except Exception as e:
+            log_warning(f"Recovery sweep failed: {str(e)}")
+        await asyncio.sleep(RECOVERY_SWEEP_INTERVAL_SECONDS)
+
+async def store_image_variants(
+    original_image: Union[bytes, str],
+    original_path: str,
+    colorized_bytes: bytes,
+    colorized_path: str
+) -> dict:
+    """
+    Generate WebP thumbnails and previews of both images and store them
+    next to the full-size files. Variants are a convenience for galleries,
+    so a failure here is logged and does not fail the colorization.
+    
+    Args:
+        original_image: The original image, as bytes or a local file path
+        original_path: The path to the original image in storage
+        colorized_bytes: The binary content of the colorized image
+        colorized_path: The path to the colorized image in storage
+        
+    Returns:
+        dict: Public URLs keyed by `colorize_requests` column name
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        original_variants, colorized_variants = await asyncio.gather(
+            loop.run_in_executor(None, generate_variants, original_image),
+            loop.run_in_executor(None, generate_variants, colorized_bytes)
+        )
+        
+        urls = {}
+        for prefix, bucket, full_path, variants in (
+            ("original", storage_service.BUCKET_ORIGINAL, original_path, original_variants),
+            ("colorized", storage_service.BUCKET_COLORIZED, colorized_path, colorized_variants),
+        ):
+            paths = await storage_service.upload_variants(bucket, full_path, variants)
+            for variant, path in paths.items():
+                urls[f"{prefix}_{variant}_url"] = await storage_service.get_public_url(bucket, path)
+        return urls
+    
+    except Exception as e:
+        log_warning(f"Failed to store image variants for {original_path}: {str(e)}")
+        return {}
 
 @router.post("/ephemeral", response_model=ColorizeEphemeralResponse)
 async def colorize_ephemeral(
+    response: Response,
     file: UploadFile = File(...),
     platform: Optional[str] = Form(None),
     user_id: Optional[str] = Form(None),
@@ -205,18 +779,22 @@ async def colorize_ephemeral(
 ):
     """Colorize an image completely in-memory and return base64 strings.
 
-    This endpoint is used for the privacy-first flow; no data is persisted.
+    This endpoint is used for the privacy-first flow; no data is persisted,
+    and the response must not be cached either.
     """
+    response.headers["Cache-Control"] = "no-store"
     # Validate image
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
+    dimensions = probe_image_dimensions(file.file)
+    reservation = admission_controller.try_acquire(estimate_upload_cost(file, dimensions, ephemeral=True))
+
     try:
         image_bytes = await file.read()
-        # Run through Google AI
-        colorized_bytes = await colorizer.colorize_image(image_bytes)
+        # Run through Google AI; someone is waiting, so take the fastest model
+        colorized_bytes = await model_router.colorize(image_bytes, PriorityClass.INTERACTIVE, dimensions)
 
-        import base64
         original_b64 = base64.b64encode(image_bytes).decode()
         colorized_b64 = base64.b64encode(colorized_bytes).decode()
 
@@ -259,5 +837,15 @@ async def colorize_ephemeral(
             "colorized_base64": colorized_b64,
             "expires_in": 900,
         }
+    except ModelUnavailableError as e:
+        # Until the first model's cooldown ends, if the router knows it
+        retry_after = math.ceil(e.retry_after) if e.retry_after else MODEL_THROTTLE_COOLDOWN_SECONDS
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(retry_after)},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to colorize image: {str(e)}")
+    finally:
+        reservation.release()
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.db.supabase_db import get_supabase_client, safe_supabase_operation
+from app.core.model_router import model_router
 from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -10,6 +12,21 @@ class StatsResponse(BaseModel):
     total_memories: int
     last_updated: str
 
+class ModelStats(BaseModel):
+    name: str
+    model: str
+    healthy: bool
+    unavailable_for_s: float
+    calls: int
+    errors: int
+    throttles: int
+    error_rate: float
+    ewma_latency_ms: float
+    p50_latency_ms: Optional[float] = None
+    p95_latency_ms: Optional[float] = None
+    cost: float
+    max_pixels: Optional[int] = None
+
 @router.get("/", response_model=StatsResponse)
 async def get_stats():
     """
@@ -53,3 +70,11 @@ async def get_stats():
             status_code=500,
             detail=f"Failed to retrieve stats: {str(e)}"
         )
+
+@router.get("/models", response_model=List[ModelStats])
+async def get_model_stats():
+    """
+    Per-model latency, error and throttling stats used for routing.
+    Stats are kept per worker process, so this reflects the worker that served the request.
+    """
+    return model_router.snapshot()
@@ -45,6 +45,71 @@ print(f"SUPABASE_PROJECT_URL: {SUPABASE_PROJECT_URL}")
 SUPABASE_API_KEY = os.getenv("SUPABASE_API_KEY_RM")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY_RM")
 SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY_RM")
+# JWT secret used to verify access tokens locally (Project Settings > API)
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET_RM")
 
 # Google AI API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
\ No newline at end of file
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Admission control: memory each worker may commit to in-flight image processing
+ADMISSION_MEMORY_BUDGET_MB = int(os.getenv("ADMISSION_MEMORY_BUDGET_MB", "1024"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "10"))
+
+# Gallery variants generated alongside every stored image (longest side, in pixels)
+THUMBNAIL_MAX_SIDE = int(os.getenv("THUMBNAIL_MAX_SIDE", "256"))
+PREVIEW_MAX_SIDE = int(os.getenv("PREVIEW_MAX_SIDE", "1024"))
+VARIANT_WEBP_QUALITY = int(os.getenv("VARIANT_WEBP_QUALITY", "80"))
+
+# Graceful shutdown and recovery of interrupted colorizations
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "25"))
+STALE_PROCESSING_SECONDS = int(os.getenv("STALE_PROCESSING_SECONDS", "900"))
+# A `queued` request only counts as orphaned (and is picked up by any
+# worker's sweep) once it has been queued this long
+STALE_QUEUED_SECONDS = int(os.getenv("STALE_QUEUED_SECONDS", "120"))
+STALE_REQUEST_MAX_AGE_SECONDS = int(os.getenv("STALE_REQUEST_MAX_AGE_SECONDS", "86400"))
+RECOVERY_SWEEP_INTERVAL_SECONDS = int(os.getenv("RECOVERY_SWEEP_INTERVAL_SECONDS", "60"))
+
+# Build the Gemini and Supabase clients in the background after startup
+# instead of on the first request that needs them
+WARM_UP_CLIENTS = os.getenv("WARM_UP_CLIENTS", "true").lower() == "true"
+
+# Background colorization jobs: how many run at once per worker (the rest
+# wait holding only a storage path) and where originals are spooled to disk
+COLORIZE_MAX_CONCURRENT_JOBS = int(os.getenv("COLORIZE_MAX_CONCURRENT_JOBS", "4"))
+COLORIZE_SPOOL_DIR = os.getenv("COLORIZE_SPOOL_DIR") or None
+
+# Colorization models. JSON list of backends, e.g.
+# [{"name": "flash", "model": "gemini-2.5-flash-image-preview", "cost": 1},
+#  {"name": "flash-lite", "model": "...", "prompt": "...", "max_pixels": 1048576, "cost": 0.5}]
+# Defaults to the single gemini-2.5-flash-image-preview backend.
+COLORIZE_MODELS = os.getenv("COLORIZE_MODELS")
+MODEL_THROTTLE_COOLDOWN_SECONDS = int(os.getenv("MODEL_THROTTLE_COOLDOWN_SECONDS", "30"))
+MODEL_ERROR_COOLDOWN_SECONDS = int(os.getenv("MODEL_ERROR_COOLDOWN_SECONDS", "60"))
+
+# Per-client rate limit on requests that start a colorization (upload,
+# upload-url, ephemeral). Clients are keyed on the verified JWT subject,
+# else the client IP. The "memory" store is per worker; "sqlite" is shared
+# by all workers on the host. RATE_LIMIT_TRUSTED_PROXIES is the number of
+# reverse proxies in front of the app whose X-Forwarded-For can be trusted
+# (1 on Azure App Service). Off by default: enable it only once the JWT
+# secret and proxy count are configured, or every client shares one limit.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "10"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/rangmantra-rate-limit.db")
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+
+# Compression of text (JSON) responses. "br" needs the optional brotli
+# package and is skipped without it; the first listed coding the client
+# accepts is used.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ALGORITHMS = os.getenv("COMPRESSION_ALGORITHMS", "br,gzip")
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Caching: max-age of stored images (their paths never change content), and
+# how long clients may reuse a finished request's /status response
+STORAGE_CACHE_MAX_AGE_SECONDS = int(os.getenv("STORAGE_CACHE_MAX_AGE_SECONDS", "31536000"))
+STATUS_CACHE_MAX_AGE_SECONDS = int(os.getenv("STATUS_CACHE_MAX_AGE_SECONDS", "300"))
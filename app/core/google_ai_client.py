@@ -1,17 +1,57 @@
 # Core libs
 import os
 import base64
+import asyncio
 from io import BytesIO
-
-# Third-party
-import google.generativeai as genai
-from PIL import Image
+from functools import lru_cache
+from typing import Optional
 
 # Project settings
 from app.config.settings import GOOGLE_API_KEY
 
-# Initialize Google Generative AI client with API key
-genai.configure(api_key=GOOGLE_API_KEY)
+
+# The Google SDK takes the better part of a second to import, so it is only
+# loaded (and configured with the API key) the first time a model is needed
+@lru_cache
+def get_genai():
+    import google.generativeai as genai
+    genai.configure(api_key=GOOGLE_API_KEY)
+    return genai
+
+
+# google.api_core exception class names that mean the backend, not the image,
+# is the problem; matched by name so the SDK doesn't have to be imported here
+_THROTTLED_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+_UNAVAILABLE_ERRORS = {"ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "GatewayTimeout", "BadGateway"}
+
+
+class ModelUnavailableError(Exception):
+    """
+    Raised when the model backend is throttled or failing, so the same image
+    may well succeed on another model. `retry_after`, if known, is the
+    number of seconds until a model should be available again.
+    """
+    
+    def __init__(self, message: str, throttled: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.throttled = throttled
+        self.retry_after = retry_after
+
+
+def classify_backend_error(error: Exception):
+    """
+    Returns a ModelUnavailableError if `error` came from the model backend
+    being throttled or down, otherwise None
+    """
+    name = type(error).__name__
+    code = getattr(error, "code", None)
+    message = str(error).lower()
+    if name in _THROTTLED_ERRORS or code == 429 or "quota" in message or "rate limit" in message:
+        return ModelUnavailableError(f"Model is throttled: {error}", throttled=True)
+    if name in _UNAVAILABLE_ERRORS or code in (500, 502, 503, 504):
+        return ModelUnavailableError(f"Model is unavailable: {error}")
+    return None
+
 
 class ImageColorizer:
     """
@@ -20,27 +60,52 @@ class ImageColorizer:
     
     def __init__(self, model_name="gemini-2.5-flash-image-preview"):
         """
-        Initialize the colorizer with a specific model
+        Initialize the colorizer with a specific model. The model client is
+        created on first use.
         """
-        self.model = genai.GenerativeModel(model_name)
+        self.model_name = model_name
+        self._model = None
         self.prompt = (
             "Colorize and restore the original photograph while keeping its authenticity. Tasks:  - Apply subtle, historically accurate colorization with natural skin tones, hair colors, and clothing hues.  - Remove blurriness and restore fine details in faces, clothing, and background.  - Repair discoloration, fading, stains, and spots while preserving the natural texture and grain.  - Avoid oversaturation or artificial enhancements.  - Should look like AI generated  Goal: Deliver a clean, sharp, and realistic version of the original photograph that feels historically authentic and emotionally true to its time."
         )
     
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_genai().GenerativeModel(self.model_name)
+        return self._model
+    
+    def warm_up(self):
+        """
+        Import the SDK and build the model client ahead of the first request
+        """
+        from PIL import Image  # noqa: F401
+        return self.model
 
-    async def colorize_image(self, image_bytes, prompt_override: str | None = None):
+    async def colorize_image(self, image, prompt_override: str | None = None):
         """
         Process a black and white image and return the colorized version
         
+        Decoding, the (blocking) model call and re-encoding all run in a
+        worker thread so concurrent jobs don't stall the event loop.
+        
         Args:
-            image_bytes (bytes): Raw binary data of the image
+            image (bytes | str): Raw binary data of the image, or the path of an image file
             
         Returns:
             bytes: Colorized image data
         """
+        return await asyncio.get_event_loop().run_in_executor(
+            None, self._colorize_image_sync, image, prompt_override
+        )
+    
+    def _colorize_image_sync(self, image, prompt_override: str | None = None):
+        from PIL import Image
+        genai = get_genai()
+        
         try:
-            # Create PIL image from bytes
-            img = Image.open(BytesIO(image_bytes))
+            # Create PIL image from bytes, or lazily from a file on disk
+            img = Image.open(BytesIO(image) if isinstance(image, (bytes, bytearray)) else image)
             
             # Validate and preprocess image
             if img.mode not in ['RGB', 'RGBA', 'L', 'P']:
@@ -122,6 +187,11 @@ class ImageColorizer:
             error_msg = str(e)
             print(f"Error colorizing image: {error_msg}")
             
+            # Let the caller fail over to another model
+            backend_error = classify_backend_error(e)
+            if backend_error:
+                raise backend_error
+            
             # Provide specific error messages for better user experience
             if "cannot identify image file" in error_msg.lower():
                 raise Exception("Invalid image format. Please upload a valid image file (JPEG, PNG, etc.)")
@@ -0,0 +1,224 @@
+import json
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import COLORIZE_MODELS, MODEL_THROTTLE_COOLDOWN_SECONDS, MODEL_ERROR_COOLDOWN_SECONDS
+from app.core.google_ai_client import ImageColorizer, ModelUnavailableError
+from app.utils.logger import log_info, log_warning
+
+DEFAULT_MODEL = "gemini-2.5-flash-image-preview"
+
+# Consecutive backend errors before a model is taken out of rotation
+MAX_CONSECUTIVE_ERRORS = 3
+
+# Latency assumed for a model that hasn't been measured yet
+DEFAULT_EXPECTED_LATENCY = 15.0
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+
+
+class PriorityClass(str, Enum):
+    INTERACTIVE = "interactive"  # a user is waiting on the response (/ephemeral)
+    BATCH = "batch"              # background jobs (/upload)
+
+
+class ModelBackend:
+    """
+    One configured model (and prompt variant) plus its observed health
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        prompt: Optional[str] = None,
+        max_pixels: Optional[int] = None,
+        cost: float = 1.0,
+        expected_latency: float = DEFAULT_EXPECTED_LATENCY,
+    ):
+        self.name = name
+        self.colorizer = ImageColorizer(model)
+        self.prompt = prompt
+        self.max_pixels = max_pixels
+        self.cost = cost
+
+        self.ewma_latency = expected_latency
+        self.ewma_error_rate = 0.0
+        self.latencies = deque(maxlen=200)
+        self.calls = 0
+        self.errors = 0
+        self.throttles = 0
+        self.consecutive_errors = 0
+        self.unavailable_until = 0.0
+        self.throttled = False
+
+    def accepts(self, pixels: Optional[int]) -> bool:
+        return not (self.max_pixels and pixels and pixels > self.max_pixels)
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unavailable_until
+
+    def score(self) -> float:
+        """Expected latency, penalized by recent error rate; lower is better"""
+        return self.ewma_latency * (1.0 + 4.0 * self.ewma_error_rate)
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.consecutive_errors = 0
+        self.throttled = False
+        self.latencies.append(latency)
+        self.ewma_latency += EWMA_ALPHA * (latency - self.ewma_latency)
+        self.ewma_error_rate *= (1.0 - EWMA_ALPHA)
+
+    def record_failure(self, throttled: bool):
+        self.calls += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.ewma_error_rate += EWMA_ALPHA * (1.0 - self.ewma_error_rate)
+        self.throttled = throttled
+        now = time.monotonic()
+        if throttled:
+            self.throttles += 1
+            self.unavailable_until = max(self.unavailable_until, now + MODEL_THROTTLE_COOLDOWN_SECONDS)
+            log_warning(f"Model {self.name} is throttled; out of rotation for {MODEL_THROTTLE_COOLDOWN_SECONDS}s")
+        elif self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+            self.unavailable_until = max(self.unavailable_until, now + MODEL_ERROR_COOLDOWN_SECONDS)
+            log_warning(
+                f"Model {self.name} failed {self.consecutive_errors} times in a row; "
+                f"out of rotation for {MODEL_ERROR_COOLDOWN_SECONDS}s"
+            )
+
+    def snapshot(self, now: float) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 1)
+
+        return {
+            "name": self.name,
+            "model": self.colorizer.model_name,
+            "healthy": self.is_healthy(now),
+            "unavailable_for_s": round(max(0.0, self.unavailable_until - now), 1),
+            "calls": self.calls,
+            "errors": self.errors,
+            "throttles": self.throttles,
+            "error_rate": round(self.ewma_error_rate, 3),
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 1),
+            "p50_latency_ms": pct(0.5),
+            "p95_latency_ms": pct(0.95),
+            "cost": self.cost,
+            "max_pixels": self.max_pixels,
+        }
+
+
+class ModelRouter:
+    """
+    Routes colorizations across the configured model backends
+
+    Interactive requests go to the healthy backend with the lowest expected
+    latency; batch requests go to the cheapest healthy backend, using latency
+    as the tie-break. Backends that are throttled, or that keep failing, are
+    skipped for a cooldown period, and a request that hits a failing backend
+    automatically falls over to the next candidate. If every backend that
+    can take the image is cooling down, the request fails straight away
+    rather than spending quota on a backend that just turned it away.
+    """
+
+    def __init__(self, backends: List[ModelBackend]):
+        if not backends:
+            raise ValueError("At least one model backend must be configured")
+        self.backends = backends
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        if not COLORIZE_MODELS:
+            return cls([ModelBackend(name="default", model=DEFAULT_MODEL)])
+
+        configs = json.loads(COLORIZE_MODELS)
+        backends = [
+            ModelBackend(
+                name=config.get("name") or config["model"],
+                model=config["model"],
+                prompt=config.get("prompt"),
+                max_pixels=config.get("max_pixels"),
+                cost=float(config.get("cost", 1.0)),
+                expected_latency=float(config.get("expected_latency", DEFAULT_EXPECTED_LATENCY)),
+            )
+            for config in configs
+        ]
+        log_info(f"Colorize model backends: {', '.join(b.name for b in backends)}")
+        return cls(backends)
+
+    def eligible(self, pixels: Optional[int] = None) -> List[ModelBackend]:
+        """Backends that can take an image of `pixels` (all of them if none can)"""
+        return [b for b in self.backends if b.accepts(pixels)] or list(self.backends)
+
+    def candidates(self, priority: PriorityClass, pixels: Optional[int] = None) -> List[ModelBackend]:
+        """
+        Healthy backends to try, in order, ranked for the priority class.
+        Backends in their cooldown are left out.
+        """
+        now = time.monotonic()
+        healthy = [b for b in self.eligible(pixels) if b.is_healthy(now)]
+        if priority == PriorityClass.INTERACTIVE:
+            healthy.sort(key=lambda b: b.score())
+        else:
+            healthy.sort(key=lambda b: (b.cost, b.score()))
+        return healthy
+
+    async def colorize(self, image, priority: PriorityClass, dimensions: Optional[Tuple[int, int]] = None) -> bytes:
+        """
+        Colorize an image on the best available backend, failing over on
+        throttling or backend errors
+
+        Args:
+            image: Raw image bytes or the path of an image file
+            priority: Priority class of the request
+            dimensions: (width, height) if known, used to respect max_pixels
+
+        Returns:
+            bytes: Colorized image data
+            
+        Raises:
+            ModelUnavailableError: Every eligible backend failed or is cooling
+                down; `retry_after` is the time until the first is back
+        """
+        pixels = dimensions[0] * dimensions[1] if dimensions else None
+        last_error = None
+        for backend in self.candidates(priority, pixels):
+            started = time.monotonic()
+            try:
+                result = await backend.colorizer.colorize_image(image, prompt_override=backend.prompt)
+            except ModelUnavailableError as e:
+                backend.record_failure(throttled=e.throttled)
+                last_error = e
+                continue
+            backend.record_success(time.monotonic() - started)
+            return result
+
+        eligible = self.eligible(pixels)
+        now = time.monotonic()
+        if last_error:
+            log_warning(f"All model backends failed: {last_error}")
+        raise ModelUnavailableError(
+            "The AI service is busy right now. Please try again in a few minutes.",
+            throttled=any(b.throttled for b in eligible),
+            retry_after=min(max(0.0, b.unavailable_until - now) for b in eligible) or None,
+        )
+
+    def warm_up(self):
+        for backend in self.backends:
+            backend.colorizer.warm_up()
+
+    def snapshot(self) -> List[Dict]:
+        now = time.monotonic()
+        return [backend.snapshot(now) for backend in self.backends]
+
+
+# One router (and one set of stats) per worker process
+model_router = ModelRouter.from_settings()
@@ -1,4 +1,3 @@
-from supabase import create_client, Client
 from app.config.settings import SUPABASE_PROJECT_URL, SUPABASE_API_KEY, SUPABASE_SERVICE_KEY
 from fastapi import HTTPException
 # from app.utils.logger import log_info, log_error, log_debugger
@@ -21,6 +20,8 @@ def get_supabase_client():
     # Avoid logging the actual secret value
     which_key = "anon" if SUPABASE_API_KEY else "service"
     # log_debugger(f"Using Supabase key type: {which_key}")
+    # Imported here: the SDK is slow to import and not needed until first use
+    from supabase import create_client, Client
     supbase: Client = create_client(SUPABASE_PROJECT_URL, key_to_use)
     return supbase
 
@@ -49,3 +50,22 @@ async def safe_supabase_operation(operation, error_message="Supabase operation f
                 await asyncio.sleep(backoff_seconds * attempt)
                 continue
             raise HTTPException(status_code=500, detail=f"{error_message}: {error_text}")
+
+# postgrest-py 0.13 has no or_(); add PostgREST's `or` parameter directly
+def or_filter(query, *conditions: str):
+    """
+    Keep rows matching any of `conditions`, each in PostgREST filter syntax,
+    e.g. or_filter(query, 'created_at.lt."2024-01-01T00:00:00"', 'and(...)')
+    """
+    query.params = query.params.add("or", f"({','.join(conditions)})")
+    return query
+
+# Repeated .order() calls become repeated `order` parameters; PostgREST wants
+# one comma separated list for a multi-column sort
+def order_by(query, *columns: str):
+    """
+    Sort by several columns, each as `column[.desc]`, e.g.
+    order_by(query, "created_at.desc", "id.desc")
+    """
+    query.params = query.params.add("order", ",".join(columns))
+    return query
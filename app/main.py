@@ -11,8 +11,13 @@ from fastapi.responses import JSONResponse
 from fastapi import Request
 from contextlib import asynccontextmanager
 from app.services.logging import setup_logging
-from app.utils.logger import log_info
-import httpx
+from app.services.task_registry import task_registry
+from app.services.rate_limit import RateLimitMiddleware, rate_limit_options
+from app.services.compression import CompressionMiddleware, compression_options
+from app.api.v1.routes.colorize import run_recovery_sweeper, requeue_interrupted_requests, warm_up_clients
+from app.config.settings import SHUTDOWN_DRAIN_SECONDS, WARM_UP_CLIENTS
+from app.utils.logger import log_info, log_warning
+import asyncio
 import sys
 import os
 from . import config
@@ -22,11 +27,38 @@ from . import config
 logger = setup_logging()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # SDK imports and client setup happen lazily so the worker can serve
+    # straight away; optionally pay for them in the background right after
+    # startup rather than on the first colorize request.
+    if WARM_UP_CLIENTS:
+        async def warm_up():
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, warm_up_clients)
+            except Exception as e:
+                log_warning(f"Client warm-up failed: {str(e)}")
+        asyncio.create_task(warm_up())
+    
+    # Resume colorizations interrupted by a previous shutdown or crash
+    sweeper = asyncio.create_task(run_recovery_sweeper())
+    
+    yield
+    
+    # On SIGTERM uvicorn stops accepting connections before running this:
+    # give in-flight colorizations until the deadline, then park the rest
+    # as `queued` so the next worker resumes them.
+    sweeper.cancel()
+    unfinished = await task_registry.drain(SHUTDOWN_DRAIN_SECONDS)
+    if unfinished:
+        await requeue_interrupted_requests(unfinished)
+
+
 app = FastAPI(
     title="RangMantra - Add Color to your Photo",
     description="Add Color to your Photo.",
     version="1.0.0",
-    # lifespan=lifespan,
+    lifespan=lifespan,
     debug=True,
     redirect_slashes=False
 )
@@ -46,6 +78,17 @@ origins = [
     "https://development--rangmantra.netlify.app"
 ]
 
+# Per-client rate limit on colorization requests. Added before CORS so that
+# CORS stays outermost and 429s still carry the CORS headers.
+rate_limit = rate_limit_options()
+if rate_limit:
+    app.add_middleware(RateLimitMiddleware, **rate_limit)
+
+# gzip/brotli for JSON responses (the base64 in /ephemeral, history pages)
+compression = compression_options()
+if compression:
+    app.add_middleware(CompressionMiddleware, **compression)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Specify allowed methods
     allow_headers=["*"],  # Keep headers flexible for auth tokens
+    expose_headers=["Retry-After"],  # Let the frontend back off on 429/503
 )
 
 # Custom exception handler for HTTP exceptions
@@ -62,6 +106,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),
     )
 
 # Custom exception handler for validation errors
@@ -1,10 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
 
 class ColorizeStatus(str, Enum):
+    AWAITING_UPLOAD = "awaiting_upload"
+    QUEUED = "queued"
     PROCESSING = "processing"
     COMPLETE = "complete"
     FAILED = "failed"
@@ -20,11 +22,46 @@ class ColorizeResponse(BaseModel):
     status: ColorizeStatus = Field(..., description="Status of the colorization request")
     original_url: Optional[str] = Field(None, description="URL to the original image")
     colorized_url: Optional[str] = Field(None, description="URL to the colorized image")
+    original_thumbnail_url: Optional[str] = Field(None, description="URL to a small WebP thumbnail of the original image")
+    original_preview_url: Optional[str] = Field(None, description="URL to a medium WebP preview of the original image")
+    colorized_thumbnail_url: Optional[str] = Field(None, description="URL to a small WebP thumbnail of the colorized image")
+    colorized_preview_url: Optional[str] = Field(None, description="URL to a medium WebP preview of the colorized image")
     error_message: Optional[str] = Field(None, description="Error message if colorization failed")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="When the request was created")
     completed_at: Optional[datetime] = Field(None, description="When the request was completed")
 
 
+class ColorizeUploadUrlResponse(BaseModel):
+    """Response for the direct-to-storage upload flow.
+
+    The client uploads the original straight to `upload_url` (a Supabase
+    signed upload URL, PUT with the file as multipart form data), then calls
+    `POST /colorize/upload/{request_id}/complete` to start colorization.
+    """
+
+    request_id: str = Field(..., description="Unique ID for this colorization request")
+    upload_url: str = Field(..., description="Signed URL to upload the original image to")
+    token: str = Field(..., description="Upload token, already included in `upload_url`")
+    path: str = Field(..., description="Storage path the image will be stored at")
+    expires_in: int = Field(..., description="Seconds the upload URL stays valid")
+
+
+class ColorizeHistoryItem(BaseModel):
+    request_id: str = Field(..., description="Unique ID for this colorization request")
+    status: ColorizeStatus = Field(..., description="Status of the colorization request")
+    original_url: Optional[str] = Field(None, description="URL to the original image")
+    colorized_url: Optional[str] = Field(None, description="URL to the colorized image")
+    original_thumbnail_url: Optional[str] = Field(None, description="URL to a small WebP thumbnail of the original image")
+    colorized_thumbnail_url: Optional[str] = Field(None, description="URL to a small WebP thumbnail of the colorized image")
+    created_at: datetime = Field(..., description="When the request was created")
+    completed_at: Optional[datetime] = Field(None, description="When the request was completed")
+
+
+class ColorizeHistoryResponse(BaseModel):
+    items: List[ColorizeHistoryItem] = Field(default_factory=list, description="Requests, newest first")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; absent on the last page")
+
+
 class ColorizeEphemeralResponse(BaseModel):
     """Response for the privacy-first, non-persistent colourization flow.
 
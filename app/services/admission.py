@@ -0,0 +1,202 @@
+import asyncio
+import os
+from typing import BinaryIO, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.config.settings import ADMISSION_MEMORY_BUDGET_MB, ADMISSION_RETRY_AFTER_SECONDS
+from app.utils.logger import log_warning
+
+# ImageColorizer downsizes anything larger than this before calling the model
+MODEL_MAX_SIDE = 2048
+
+
+def probe_image_dimensions(fileobj: BinaryIO) -> Optional[Tuple[int, int]]:
+    """
+    Read the image header to get its dimensions without decoding pixel data
+
+    Args:
+        fileobj: A seekable binary file object positioned anywhere
+
+    Returns:
+        Optional[Tuple[int, int]]: (width, height), or None if it isn't a readable image
+    """
+    from PIL import Image
+    
+    position = fileobj.tell()
+    try:
+        fileobj.seek(0)
+        with Image.open(fileobj) as img:
+            return img.size
+    except Exception:
+        return None
+    finally:
+        fileobj.seek(position)
+
+
+def estimate_request_cost(upload_size: int, dimensions: Optional[Tuple[int, int]], ephemeral: bool = False) -> int:
+    """
+    Estimate the peak memory a colorization request holds while in flight
+
+    Args:
+        upload_size: Size of the uploaded file in bytes
+        dimensions: (width, height) of the upload, or None if unknown
+        ephemeral: Whether the result is returned inline as base64
+
+    Returns:
+        int: Estimated bytes
+    """
+    width, height = dimensions or (MODEL_MAX_SIDE, MODEL_MAX_SIDE)
+    decoded = width * height * 4
+
+    # What is sent to and received from the model is bounded by the resize
+    scale = min(1.0, MODEL_MAX_SIDE / max(width, height, 1))
+    model_pixels = int(width * scale) * int(height * scale)
+    model_response = model_pixels * 3   # encoded payload returned by the API
+    result_decoded = model_pixels * 4   # decoded before re-encoding to PNG
+    result_png = model_pixels * 3       # re-encoded PNG (noise-free upper bound)
+
+    cost = upload_size + decoded + model_response + result_decoded + result_png
+    if ephemeral:
+        # Both images as base64 strings, plus the serialized JSON body
+        base64_size = (upload_size + result_png) * 4 // 3
+        cost += base64_size * 2
+    return cost
+
+
+def get_upload_size(file: UploadFile) -> int:
+    """
+    Size of an uploaded file in bytes, without reading it into memory
+    """
+    size = file.size
+    if size is None:
+        file.file.seek(0, 2)
+        size = file.file.tell()
+        file.file.seek(0)
+    return size
+
+
+def estimate_upload_cost(file: UploadFile, dimensions: Optional[Tuple[int, int]], ephemeral: bool = False) -> int:
+    """
+    Estimate the memory cost of processing an uploaded image before reading it into memory
+    """
+    return estimate_request_cost(get_upload_size(file), dimensions, ephemeral=ephemeral)
+
+
+def estimate_file_cost(path: str, dimensions: Optional[Tuple[int, int]]) -> int:
+    """
+    Estimate the memory cost of processing an image spooled to disk
+    """
+    return estimate_request_cost(os.path.getsize(path), dimensions)
+
+
+class Reservation:
+    """
+    A slice of the memory budget held by one request. Released exactly once,
+    either explicitly or by leaving a `with` block.
+    """
+
+    def __init__(self, controller: "MemoryAdmissionController", cost: int):
+        self._controller = controller
+        self.cost = cost
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(self.cost)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class MemoryAdmissionController:
+    """
+    Admits image processing work against a per-worker memory budget
+
+    Every request reserves its estimated cost up front. When the budget is
+    exhausted new work is refused with a 503 and a Retry-After header instead
+    of letting the worker run out of memory. A single request larger than the
+    whole budget is still admitted when the worker is otherwise idle.
+
+    Background jobs wait for budget instead of being refused. While one is
+    waiting, requests only get in if they leave room for it, so a steady
+    stream of interactive requests can't starve the job.
+    """
+
+    def __init__(self, budget_bytes: int, retry_after_seconds: int = 10):
+        self.budget_bytes = budget_bytes
+        self.retry_after_seconds = retry_after_seconds
+        self.in_use = 0
+        self.active = 0
+        self._released = asyncio.Event()
+        self._waiting: List[int] = []
+
+    def _fits(self, cost: int) -> bool:
+        return self.in_use + cost <= self.budget_bytes
+
+    def _grant(self, cost: int) -> Reservation:
+        self.in_use += cost
+        self.active += 1
+        return Reservation(self, cost)
+
+    def try_acquire(self, cost: int) -> Reservation:
+        """
+        Reserve `cost` bytes of the budget or raise a 503 if it doesn't fit
+
+        Args:
+            cost: Estimated bytes the request will hold
+
+        Returns:
+            Reservation: Must be released when the work completes
+        """
+        cost = min(cost, self.budget_bytes)
+        # Leave room for the job that has waited longest
+        held_back = self._waiting[0] if self._waiting else 0
+        if not self._fits(cost + held_back):
+            log_warning(
+                f"Admission rejected: need {cost} bytes, {self.in_use}/{self.budget_bytes} in use "
+                f"by {self.active} requests"
+            )
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy processing other images. Please try again shortly.",
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+        return self._grant(cost)
+
+    async def acquire(self, cost: int) -> Reservation:
+        """
+        Reserve `cost` bytes of the budget, waiting until enough is released.
+        Used by background jobs, which can queue rather than be refused.
+
+        Args:
+            cost: Estimated bytes the job will hold
+
+        Returns:
+            Reservation: Must be released when the work completes
+        """
+        cost = min(cost, self.budget_bytes)
+        self._waiting.append(cost)
+        try:
+            while not self._fits(cost):
+                self._released.clear()
+                await self._released.wait()
+        finally:
+            self._waiting.remove(cost)
+        return self._grant(cost)
+
+    def _release(self, cost: int):
+        self.in_use = max(0, self.in_use - cost)
+        self.active = max(0, self.active - 1)
+        self._released.set()
+
+
+# One controller per worker process
+admission_controller = MemoryAdmissionController(
+    budget_bytes=ADMISSION_MEMORY_BUDGET_MB * 1024 * 1024,
+    retry_after_seconds=ADMISSION_RETRY_AFTER_SECONDS,
+)
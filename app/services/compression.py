@@ -0,0 +1,163 @@
+import asyncio
+import gzip
+from typing import List, Optional, Sequence
+
+from app.config.settings import (
+    COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_ALGORITHMS,
+    COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY,
+)
+from app.utils.logger import log_info, log_warning
+
+# Only text compresses usefully; images are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+# Bodies larger than this are compressed in a worker thread so a big
+# /ephemeral response doesn't stall the event loop
+OFFLOAD_SIZE = 256 * 1024
+
+
+def _header(headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def parse_accept_encoding(value: str) -> List[str]:
+    """
+    The codings a client accepts (q > 0), e.g. "gzip, br;q=0.8" -> ["gzip", "br"]
+    """
+    accepted = []
+    for item in value.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.append(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compresses text responses (JSON, HTML) with brotli or gzip, whichever
+    comes first in `algorithms` that the client accepts. Responses smaller
+    than `minimum_size`, or already encoded, are sent as they are.
+
+    Bodies are buffered before compressing, which suits this API's JSON
+    responses; streamed responses end up sent in one piece.
+    """
+
+    def __init__(self, app, algorithms: Sequence[str] = ("br", "gzip"), minimum_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli = None
+        if "br" in algorithms:
+            try:
+                import brotli
+                self.brotli = brotli
+            except ImportError:
+                log_warning("brotli is not installed; compressing with gzip only")
+        self.algorithms = [a for a in algorithms if a == "gzip" or (a == "br" and self.brotli)]
+
+    def choose_encoding(self, scope) -> Optional[str]:
+        accept = _header(scope.get("headers", ()), b"accept-encoding")
+        if not accept:
+            return None
+        accepted = parse_accept_encoding(accept.decode("latin-1"))
+        for algorithm in self.algorithms:
+            if algorithm in accepted:
+                return algorithm
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return self.brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(scope)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+                if _header(headers, b"content-encoding") or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+            if len(body) >= self.minimum_size:
+                if len(body) > OFFLOAD_SIZE:
+                    body = await asyncio.get_event_loop().run_in_executor(None, self.compress, body, encoding)
+                else:
+                    body = self.compress(body, encoding)
+                headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"content-length", str(len(body)).encode()))
+            # Caches must keep compressed and uncompressed copies apart
+            vary = _header(headers, b"vary")
+            if vary is None:
+                headers.append((b"vary", b"Accept-Encoding"))
+            elif b"accept-encoding" not in vary.lower():
+                headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+                headers.append((b"vary", vary + b", Accept-Encoding"))
+
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
+
+
+def compression_options() -> Optional[dict]:
+    """
+    Keyword arguments for CompressionMiddleware from the settings, or None if
+    compression is disabled
+    """
+    if not COMPRESSION_ENABLED:
+        return None
+    algorithms = [a.strip().lower() for a in COMPRESSION_ALGORITHMS.split(",") if a.strip()]
+    unknown = [a for a in algorithms if a not in ("br", "gzip")]
+    if unknown:
+        raise ValueError(f"Unsupported COMPRESSION_ALGORITHMS: {', '.join(unknown)}")
+    log_info(f"Compressing text responses of {COMPRESSION_MIN_SIZE}+ bytes with {', '.join(algorithms)}")
+    return {
+        "algorithms": algorithms,
+        "minimum_size": COMPRESSION_MIN_SIZE,
+        "gzip_level": COMPRESSION_GZIP_LEVEL,
+        "brotli_quality": COMPRESSION_BROTLI_QUALITY,
+    }
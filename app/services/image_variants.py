@@ -0,0 +1,48 @@
+from io import BytesIO
+from typing import Dict, Union
+
+from app.config.settings import THUMBNAIL_MAX_SIDE, PREVIEW_MAX_SIDE, VARIANT_WEBP_QUALITY
+
+# Largest first, so each smaller variant is downscaled from the previous one
+VARIANT_SIZES = {
+    "preview": PREVIEW_MAX_SIDE,
+    "thumbnail": THUMBNAIL_MAX_SIDE,
+}
+
+
+def variant_path(path: str, variant: str) -> str:
+    """
+    Storage path of a variant stored next to the full-size image
+
+    e.g. `user/abc.png` -> `user/abc_thumbnail.webp`
+    """
+    base = path.rsplit(".", 1)[0] if "." in path.rsplit("/", 1)[-1] else path
+    return f"{base}_{variant}.webp"
+
+
+def generate_variants(image: Union[bytes, str]) -> Dict[str, bytes]:
+    """
+    Build WebP preview and thumbnail versions of an image in one decode
+
+    Args:
+        image: Encoded image data, or the path of an image file
+
+    Returns:
+        Dict[str, bytes]: WebP bytes keyed by variant name
+    """
+    from PIL import Image
+    
+    with Image.open(BytesIO(image) if isinstance(image, bytes) else image) as img:
+        # Lets JPEG decode straight at a reduced scale instead of full size
+        img.draft("RGB", (PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE))
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        current = img.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for name, max_side in VARIANT_SIZES.items():
+        if current.width > max_side or current.height > max_side:
+            current.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        buf = BytesIO()
+        current.save(buf, format="WEBP", quality=VARIANT_WEBP_QUALITY, method=4)
+        variants[name] = buf.getvalue()
+    return variants
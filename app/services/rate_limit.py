@@ -0,0 +1,277 @@
+import asyncio
+import json
+import math
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.config.settings import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, RATE_LIMIT_BACKEND,
+    RATE_LIMIT_SQLITE_PATH, RATE_LIMIT_TRUSTED_PROXIES, SUPABASE_JWT_SECRET,
+)
+from app.utils.logger import log_info, log_warning
+
+# Requests that start a colorization, and so spend model quota and memory.
+# Completing a signed upload isn't counted: starting it already was.
+RATE_LIMITED_PATHS = (
+    "/api/v1/colorize/upload",
+    "/api/v1/colorize/upload-url",
+    "/api/v1/colorize/ephemeral",
+)
+
+
+class MemoryBucketStore:
+    """
+    Token buckets held in this worker's memory. Each worker enforces the
+    limit on its own, so with N workers a client can get up to N times the
+    configured rate.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float, now: float) -> float:
+        """
+        Take one token from the bucket for `key`
+
+        Args:
+            key: Client identifier
+            rate: Tokens added per second
+            capacity: Bucket size (the allowed burst)
+            now: Current time in seconds
+
+        Returns:
+            float: 0 if the request is allowed, else seconds until a token is available
+        """
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            # Least recently seen first; an evicted client starts with a full bucket
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in an SQLite file, shared by every worker on the host.
+    Another shared store (e.g. Redis) only needs the same async `take` method.
+
+    Queries run on a dedicated thread, so waiting on another worker's lock
+    never blocks the event loop, and the connection is only used from that
+    thread.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._calls = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit")
+        # Callers wait at most 100ms for the lock and fail open after that
+        self._conn = sqlite3.connect(path, timeout=0.1, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    async def take(self, key: str, rate: float, capacity: float, now: float) -> float:
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._take, key, rate, capacity, now
+        )
+
+    def _take(self, key: str, rate: float, capacity: float, now: float) -> float:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                # A bucket idle for long enough to refill is the same as no bucket
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated < ?", (now - capacity / rate,)
+                )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def create_bucket_store(backend: str):
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "sqlite":
+        return SQLiteBucketStore(RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter: each client may make `burst` requests at once,
+    refilled at `per_minute` requests per minute
+    """
+
+    def __init__(self, store, per_minute: float, burst: int):
+        self.store = store
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+
+    async def check(self, key: str) -> float:
+        """
+        Count a request from `key`
+
+        Returns:
+            float: 0 if allowed, else seconds the client should wait
+        """
+        try:
+            return await self.store.take(key, self.rate, self.capacity, time.time())
+        except Exception as e:
+            # A broken store shouldn't take the API down with it
+            log_warning(f"Rate limit store error, allowing request: {str(e)}")
+            return 0.0
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def jwt_subject(authorization: Optional[str]) -> Optional[str]:
+    """
+    The `sub` of a Supabase access token, if its signature checks out
+    against SUPABASE_JWT_SECRET. Unverified tokens are ignored, otherwise a
+    client could dodge its limit by making up a new subject per request.
+    """
+    if not SUPABASE_JWT_SECRET or not authorization or not authorization.startswith("Bearer "):
+        return None
+    import jwt
+
+    try:
+        claims = jwt.decode(
+            authorization.split(" ", 1)[1],
+            SUPABASE_JWT_SECRET,
+            algorithms=["HS256"],
+            audience="authenticated",
+        )
+    except jwt.PyJWTError:
+        return None
+    return claims.get("sub")
+
+
+def client_ip(scope, trusted_proxies: int) -> str:
+    """
+    The client address. Behind `trusted_proxies` reverse proxies it is taken
+    from X-Forwarded-For, counting from the right so a client can't spoof it.
+    """
+    if trusted_proxies > 0:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if hops:
+                ip = hops[-min(trusted_proxies, len(hops))]
+                # Some proxies (e.g. Azure App Service) append the port to IPv4 addresses
+                return ip.rsplit(":", 1)[0] if ip.count(":") == 1 else ip
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    Applies the per-client limit to the endpoints that start a colorization.
+    Runs before routing and never touches the request body, so a rejected
+    upload costs nothing beyond its headers.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, paths: Iterable[str] = RATE_LIMITED_PATHS,
+                 trusted_proxies: int = 0):
+        self.app = app
+        self.limiter = limiter
+        self.paths = frozenset(paths)
+        self.trusted_proxies = trusted_proxies
+
+    def client_key(self, scope) -> str:
+        subject = jwt_subject(_header(scope, b"authorization"))
+        if subject:
+            return f"user:{subject}"
+        return f"ip:{client_ip(scope, self.trusted_proxies)}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self.limiter.check(self.client_key(scope))
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = max(1, math.ceil(wait))
+        body = json.dumps({"detail": f"Too many requests. Please try again in {retry_after} seconds."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def rate_limit_options() -> Optional[Dict]:
+    """
+    Keyword arguments for RateLimitMiddleware from the settings, or None if
+    rate limiting is disabled
+    """
+    if not RATE_LIMIT_ENABLED:
+        return None
+    if not SUPABASE_JWT_SECRET:
+        log_warning(
+            "Rate limiting without SUPABASE_JWT_SECRET_RM: every client is limited by IP address, "
+            "so users behind a shared address share one limit"
+        )
+    if not RATE_LIMIT_TRUSTED_PROXIES:
+        log_warning(
+            "Rate limiting with RATE_LIMIT_TRUSTED_PROXIES=0: behind a reverse proxy (e.g. Azure App "
+            "Service) every client appears to come from the proxy and shares one limit"
+        )
+    log_info(
+        f"Rate limiting colorizations to {RATE_LIMIT_PER_MINUTE}/min (burst {RATE_LIMIT_BURST}) "
+        f"per client, {RATE_LIMIT_BACKEND} store"
+    )
+    return {
+        "limiter": RateLimiter(create_bucket_store(RATE_LIMIT_BACKEND), RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST),
+        "trusted_proxies": RATE_LIMIT_TRUSTED_PROXIES,
+    }
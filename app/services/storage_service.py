@@ -1,11 +1,26 @@
+import os
 import uuid
+import hashlib
 import base64
+import asyncio
+import tempfile
 from io import BytesIO
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 from app.db.supabase_db import get_supabase_client, safe_supabase_operation
+from app.services.image_variants import variant_path
+from app.config.settings import COLORIZE_SPOOL_DIR, STORAGE_CACHE_MAX_AGE_SECONDS
 from fastapi import HTTPException
 
+
+def content_address(content: bytes) -> str:
+    """
+    Name for a stored object derived from its bytes, so a path never points
+    at different content and can be cached for as long as CDNs allow
+    """
+    return hashlib.sha256(content).hexdigest()[:32]
+
+
 class StorageService:
     """
     Service for managing file storage in Supabase
@@ -14,8 +29,18 @@ class StorageService:
     BUCKET_ORIGINAL = "original-images"
     BUCKET_COLORIZED = "colorized-images"
     
-    def __init__(self):
-        self.client = get_supabase_client()
+    # Supabase signed upload URLs are valid for two hours
+    SIGNED_UPLOAD_EXPIRES_IN = 7200
+    
+    # Stored images are never modified in place (content-addressed, or a
+    # fresh UUID per upload), so browsers and CDNs can keep them indefinitely.
+    # Supabase only takes a max-age, so `immutable` can't be added.
+    CACHE_CONTROL = str(STORAGE_CACHE_MAX_AGE_SECONDS)
+    
+    @property
+    def client(self):
+        # Resolved on use so constructing the service doesn't build the Supabase client
+        return get_supabase_client()
     
     async def ensure_buckets_exist(self):
         """
@@ -78,23 +103,73 @@ class StorageService:
         """
         await self.ensure_buckets_exist()
         
-        # Generate a unique filename for this user's upload
-        filename = f"{user_id}/{uuid.uuid4()}.png"
-        
-        # Upload the file
+        # Name the file after its content; the same photo uploaded twice by a
+        # user is stored once
         def upload_file():
-            return self.client.storage.from_(self.BUCKET_ORIGINAL).upload(
+            filename = f"{user_id}/{content_address(file_content)}.png"
+            self.client.storage.from_(self.BUCKET_ORIGINAL).upload(
                 path=filename,
                 file=file_content,
-                file_options={"content-type": "image/png"}
+                file_options={"content-type": "image/png", "cache-control": self.CACHE_CONTROL, "x-upsert": "true"}
             )
+            return filename
         
-        await safe_supabase_operation(
+        return await safe_supabase_operation(
             upload_file,
             error_message="Failed to upload original image"
         )
+    
+    async def create_original_upload_url(self, user_id: str) -> Dict[str, str]:
+        """
+        Create a signed URL the client can upload an original image to directly
+        
+        Args:
+            user_id: The ID of the user
+            
+        Returns:
+            Dict[str, str]: `signed_url`, `token` and the storage `path`
+        """
+        await self.ensure_buckets_exist()
+        
+        # The content isn't known yet, so the path is a fresh UUID instead.
+        # Clients should upload with the same long cacheControl.
+        filename = f"{user_id}/{uuid.uuid4()}.png"
+        
+        def create_url():
+            return self.client.storage.from_(self.BUCKET_ORIGINAL).create_signed_upload_url(filename)
+        
+        return await safe_supabase_operation(
+            create_url,
+            error_message="Failed to create signed upload URL"
+        )
+    
+    async def get_original_image_info(self, path: str) -> Optional[Dict]:
+        """
+        Look up an original image in storage without downloading it
+        
+        Args:
+            path: The path to the original image
+            
+        Returns:
+            Optional[Dict]: `size` in bytes and `mimetype`, or None if nothing is stored there yet
+        """
+        folder, _, name = path.rpartition("/")
+        
+        def find_file():
+            return self.client.storage.from_(self.BUCKET_ORIGINAL).list(folder, {"search": name, "limit": 1})
         
-        return filename
+        entries = await safe_supabase_operation(
+            find_file,
+            error_message="Failed to look up original image"
+        )
+        for entry in entries or []:
+            if entry.get("name") == name:
+                metadata = entry.get("metadata") or {}
+                return {
+                    "size": int(metadata.get("size") or 0),
+                    "mimetype": metadata.get("mimetype") or "",
+                }
+        return None
     
     async def upload_colorized_image(self, user_id: str, file_content: bytes, original_filename: str) -> str:
         """
@@ -110,23 +185,82 @@ class StorageService:
         """
         await self.ensure_buckets_exist()
         
-        # Keep same filename structure as original but in colorized bucket
-        filename = original_filename.replace(".png", "_colorized.png")
+        # Same folder as the original, named after the result's content so a
+        # resumed request writes a new object instead of changing a cached one
+        folder = original_filename.rpartition("/")[0] or user_id
         
-        # Upload the file
         def upload_file():
-            return self.client.storage.from_(self.BUCKET_COLORIZED).upload(
+            filename = f"{folder}/{content_address(file_content)}_colorized.png"
+            self.client.storage.from_(self.BUCKET_COLORIZED).upload(
                 path=filename,
                 file=file_content,
-                file_options={"content-type": "image/png"}
+                file_options={"content-type": "image/png", "cache-control": self.CACHE_CONTROL, "x-upsert": "true"}
             )
+            return filename
         
-        await safe_supabase_operation(
+        return await safe_supabase_operation(
             upload_file,
             error_message="Failed to upload colorized image"
         )
+    
+    async def upload_variants(self, bucket: str, full_path: str, variants: Dict[str, bytes]) -> Dict[str, str]:
+        """
+        Upload WebP variants (thumbnail, preview) next to a full-size image
         
-        return filename
+        Args:
+            bucket: The bucket holding the full-size image
+            full_path: The path of the full-size image
+            variants: WebP bytes keyed by variant name
+            
+        Returns:
+            Dict[str, str]: The stored path of each variant, keyed by variant name
+        """
+        async def upload_variant(variant: str, content: bytes) -> str:
+            path = variant_path(full_path, variant)
+            
+            def upload_file():
+                return self.client.storage.from_(bucket).upload(
+                    path=path,
+                    file=content,
+                    file_options={"content-type": "image/webp", "cache-control": self.CACHE_CONTROL, "x-upsert": "true"}
+                )
+            
+            await safe_supabase_operation(
+                upload_file,
+                error_message=f"Failed to upload {variant} image"
+            )
+            return path
+        
+        paths = await asyncio.gather(*(upload_variant(name, content) for name, content in variants.items()))
+        return dict(zip(variants.keys(), paths))
+    
+    async def download_original_to_spool(self, path: str) -> str:
+        """
+        Download an original image into a local temp file
+        
+        The bytes only live in memory for the duration of the download; the
+        caller works from the file and must delete it when done.
+        
+        Args:
+            path: The path to the original image
+            
+        Returns:
+            str: Path of the local spool file
+        """
+        suffix = os.path.splitext(path)[1] or ".img"
+        
+        def download_file():
+            content = self.client.storage.from_(self.BUCKET_ORIGINAL).download(path)
+            with tempfile.NamedTemporaryFile(
+                prefix="original-", suffix=suffix, dir=COLORIZE_SPOOL_DIR, delete=False
+            ) as spool:
+                spool.write(content)
+                return spool.name
+        
+        return await safe_supabase_operation(
+            download_file,
+            error_message="Failed to download original image"
+        )
     
     async def get_public_url(self, bucket: str, path: str) -> str:
         """
@@ -0,0 +1,85 @@
+import asyncio
+from typing import Coroutine, Dict, List
+
+from fastapi import HTTPException
+
+from app.utils.logger import log_info, log_warning
+
+
+class BackgroundTaskRegistry:
+    """
+    Tracks background jobs so shutdown can wait for them instead of killing them
+
+    Jobs are keyed (by request ID) so the ones that don't finish before the
+    drain deadline can be reported back and persisted for resumption.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.accepting = True
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def is_tracking(self, key: str) -> bool:
+        return key in self._tasks
+
+    def ensure_accepting(self):
+        """
+        Raise a 503 once shutdown has begun so no new work is started
+        """
+        if not self.accepting:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is restarting. Please try again shortly.",
+                headers={"Retry-After": "5"},
+            )
+
+    def spawn(self, key: str, coro: Coroutine) -> asyncio.Task:
+        """
+        Run a coroutine as a tracked background task
+
+        Args:
+            key: Identifier reported back if the task is interrupted
+            coro: The coroutine to run
+
+        Returns:
+            asyncio.Task: The created task
+        """
+        task = asyncio.create_task(coro)
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return task
+
+    def stop_accepting(self):
+        self.accepting = False
+
+    async def drain(self, timeout: float) -> List[str]:
+        """
+        Wait up to `timeout` seconds for in-flight tasks, then cancel the rest
+
+        Args:
+            timeout: Drain deadline in seconds
+
+        Returns:
+            List[str]: Keys of the tasks that had to be cancelled
+        """
+        self.stop_accepting()
+        if not self._tasks:
+            return []
+
+        log_info(f"Draining {len(self._tasks)} background tasks (deadline {timeout}s)")
+        await asyncio.wait(list(self._tasks.values()), timeout=timeout)
+
+        unfinished = {key: task for key, task in self._tasks.items() if not task.done()}
+        if unfinished:
+            log_warning(f"Cancelling {len(unfinished)} background tasks that missed the drain deadline")
+            for task in unfinished.values():
+                task.cancel()
+            await asyncio.gather(*unfinished.values(), return_exceptions=True)
+        return list(unfinished.keys())
+
+
+# One registry per worker process
+task_registry = BackgroundTaskRegistry()
@@ -0,0 +1,72 @@
+from functools import lru_cache
+
+# Real traffic has a small set of distinct User-Agents, so parsed results are
+# memoized. Keys are truncated so oversized headers can't bloat the cache.
+UA_CACHE_SIZE = 1024
+MAX_UA_LENGTH = 512
+
+# Anything containing one of these (lowercased) goes through the full parser:
+# crawlers, and the phone/tablet families where `user_agents` has special cases
+# (Kindle Fire models report as "KFTT", "KFFOWI", ... with a Mobile token)
+_NEEDS_FULL_PARSE = (
+    "bot", "crawl", "spider", "slurp", "windows phone", "iemobile", "opera mini",
+    "ipad", "tablet", "kindle", "silk", "blackberry", "bb10", "lumia",
+    "; kf", "build/kf",
+)
+
+
+def _fast_classify(ua: str):
+    """
+    Classify the common browser User-Agents with plain substring checks.
+    Returns None when unsure; the answer must match the full parser, which
+    `python -m benchmarks.user_agents` checks over a list of real UAs.
+    """
+    lowered = ua.lower()
+    if any(marker in lowered for marker in _NEEDS_FULL_PARSE):
+        return None
+    if ("iPhone" in ua or "iPod" in ua) and "like Mac OS X" in ua:
+        return "ios"
+    if "Android" in ua:
+        return "android" if "Mobile" in ua else None
+    if "Windows NT" in ua:
+        return "windows" if "Mobile" not in ua else None
+    if "Macintosh" in ua and "Mac OS X" in ua:
+        return "macos"
+    if "X11;" in ua or "CrOS" in ua:
+        return "desktop"
+    return None
+
+
+def _full_classify(ua: str) -> str:
+    from user_agents import parse as parse_ua
+
+    ua_parsed = parse_ua(ua)
+    if ua_parsed.is_mobile:
+        if ua_parsed.os.family.lower().startswith("android"):
+            return "android"
+        return "ios"
+    if ua_parsed.os.family.lower().startswith("mac"):
+        return "macos"
+    if ua_parsed.os.family.lower().startswith("windows"):
+        return "windows"
+    return "desktop"
+
+
+@lru_cache(maxsize=UA_CACHE_SIZE)
+def _classify(ua: str) -> str:
+    return _fast_classify(ua) or _full_classify(ua)
+
+
+def detect_platform(ua: str) -> str:
+    """
+    Map a User-Agent header to android, ios, macos, windows or desktop
+
+    Args:
+        ua: The raw User-Agent header, may be empty
+
+    Returns:
+        str: The platform, or "unknown" without a User-Agent
+    """
+    if not ua:
+        return "unknown"
+    return _classify(ua[:MAX_UA_LENGTH])
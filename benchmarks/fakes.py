@@ -0,0 +1,393 @@
+# In-process stand-ins for Gemini and Supabase used by the benchmark harness
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _sleep(latency: float, jitter: float):
+    """Block the calling thread like the real (synchronous) SDKs do."""
+    delay = latency + random.uniform(-jitter, jitter) if jitter else latency
+    if delay > 0:
+        time.sleep(delay)
+
+
+def make_png(width: int, height: int, mode: str = "RGB") -> bytes:
+    """
+    Build a PNG filled with random noise so it does not compress and its
+    size tracks the requested dimensions.
+    """
+    from PIL import Image
+
+    channels = len(mode)
+    img = Image.frombytes(mode, (width, height), os.urandom(width * height * channels))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def png_for_payload_kb(payload_kb: int) -> bytes:
+    """Build an RGB PNG whose encoded size is roughly `payload_kb` kilobytes."""
+    side = max(1, int(((payload_kb * 1024) / 3) ** 0.5))
+    return make_png(side, side, "RGB")
+
+
+# ────────── Gemini ──────────
+
+class ResourceExhausted(Exception):
+    """Same name and code as the google.api_core 429 error."""
+
+    code = 429
+
+
+class FakeGenerativeModel:
+    """
+    Drop-in for `genai.GenerativeModel` that sleeps for a configurable time
+    and answers with a fixed PNG payload. A fraction of calls can be made to
+    fail with a 429 to exercise model failover.
+    """
+
+    latency: float = 2.0
+    jitter: float = 0.0
+    payload: bytes = b""
+    throttle_rate: float = 0.0
+
+    def __init__(self, model_name: str = "fake-model", **kwargs):
+        self.model_name = model_name
+
+    @classmethod
+    def configure(cls, latency: float, jitter: float, payload_kb: int, throttle_rate: float = 0.0):
+        cls.latency = latency
+        cls.jitter = jitter
+        cls.payload = png_for_payload_kb(payload_kb)
+        cls.throttle_rate = throttle_rate
+
+    def generate_content(self, contents=None, generation_config=None, safety_settings=None, **kwargs):
+        _sleep(self.latency, self.jitter)
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        inline = SimpleNamespace(mime_type="image/png", data=self.payload)
+        part = SimpleNamespace(inline_data=inline, text=None)
+        candidate = SimpleNamespace(content=SimpleNamespace(parts=[part]))
+        return SimpleNamespace(candidates=[candidate])
+
+
+# ────────── Supabase ──────────
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(expression: str) -> List[str]:
+    """Split a PostgREST logic expression on commas outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    parts.append(current)
+    return [p for p in parts if p]
+
+
+def _parse_condition(condition: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Turn one PostgREST condition (`col.op.value`, `and(...)`, `or(...)`) into
+    a row predicate. Supports the eq/neq/lt/gt/is operators the app uses.
+    """
+    for logic, combine in (("and(", all), ("or(", any)):
+        if condition.startswith(logic):
+            predicates = [_parse_condition(c) for c in _split_top_level(condition[len(logic):-1])]
+            return lambda row, predicates=predicates, combine=combine: combine(p(row) for p in predicates)
+
+    column, op, value = condition.split(".", 2)
+    value = value[1:-1] if value.startswith('"') and value.endswith('"') else value
+    if op == "is":
+        return lambda row: row.get(column) is None if value == "null" else row.get(column) == value
+    compare = {
+        "eq": lambda a, b: a == b,
+        "neq": lambda a, b: a != b,
+        "lt": lambda a, b: a < b,
+        "gt": lambda a, b: a > b,
+    }[op]
+    return lambda row: row.get(column) is not None and compare(str(row.get(column)), value)
+
+
+class _FakeParams:
+    """Accepts the raw parameters the app adds to a query (`or`, `order`)."""
+
+    def __init__(self, query: "FakeQuery"):
+        self._query = query
+
+    def add(self, key: str, value: str):
+        if key == "or":
+            self._query._filters.append(_parse_condition(f"or{value}"))
+        elif key == "order":
+            for item in value.split(","):
+                column, _, direction = item.partition(".")
+                self._query._order.append((column, direction.startswith("desc")))
+        else:
+            raise NotImplementedError(f"Fake query does not support the {key!r} parameter")
+        return self
+
+
+class FakeQuery:
+    """Chainable subset of the postgrest query builder used by the app."""
+
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._payload: Any = None
+        self._columns: Optional[List[str]] = None
+        self._filters: List = []
+        self._order: List = []
+        self._limit: Optional[int] = None
+
+    # actions
+    def select(self, columns: str = "*", **kwargs):
+        self._action = "select"
+        if columns.strip() != "*":
+            self._columns = [c.strip() for c in columns.split(",") if c.strip()]
+        return self
+
+    def insert(self, payload, **kwargs):
+        self._action = "insert"
+        self._payload = payload
+        return self
+
+    def update(self, payload, **kwargs):
+        self._action = "update"
+        self._payload = payload
+        return self
+
+    def delete(self, **kwargs):
+        self._action = "delete"
+        return self
+
+    @property
+    def params(self) -> _FakeParams:
+        return _FakeParams(self)
+
+    @params.setter
+    def params(self, value):
+        # Set by helpers after _FakeParams.add has already applied the change
+        pass
+
+    # filters
+    def eq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def in_(self, column: str, values):
+        values = list(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def lt(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def gt(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def order(self, column: str, desc: bool = False, **kwargs):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self._limit = size
+        return self
+
+    def execute(self):
+        _sleep(self._client.db_latency, self._client.db_jitter)
+        with self._client.lock:
+            rows = self._client.tables.setdefault(self._table, [])
+            if self._action == "insert":
+                new_rows = self._payload if isinstance(self._payload, list) else [self._payload]
+                rows.extend(dict(r) for r in new_rows)
+                return FakeResponse([dict(r) for r in new_rows])
+
+            matched = [r for r in rows if all(f(r) for f in self._filters)]
+
+            if self._action == "update":
+                for row in matched:
+                    row.update(self._payload)
+                return FakeResponse([dict(r) for r in matched])
+
+            if self._action == "delete":
+                self._client.tables[self._table] = [r for r in rows if r not in matched]
+                return FakeResponse([dict(r) for r in matched])
+
+            for column, desc in reversed(self._order):
+                matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            if self._limit is not None:
+                matched = matched[: self._limit]
+            if self._columns:
+                matched = [{c: r.get(c) for c in self._columns} for r in matched]
+            else:
+                matched = [dict(r) for r in matched]
+            return FakeResponse(matched)
+
+
+class FakeBucketApi:
+    def __init__(self, client: "FakeSupabaseClient", bucket: str):
+        self._client = client
+        self._bucket = bucket
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self._client.storage_root, self._bucket, path)
+
+    def upload(self, path: str, file, file_options: Optional[Dict[str, str]] = None):
+        _sleep(self._client.storage_latency, self._client.storage_jitter)
+        file_options = file_options or {}
+        target = self._path(path)
+        if os.path.exists(target) and str(file_options.get("x-upsert", "false")).lower() != "true":
+            raise Exception("The resource already exists (Duplicate, statusCode 409)")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if isinstance(file, (bytes, bytearray)):
+            data = bytes(file)
+        elif isinstance(file, (str, os.PathLike)):
+            with open(file, "rb") as fh:
+                data = fh.read()
+        else:
+            data = file.read()
+        # Write aside and swap in, so concurrent downloads never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".upload-")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, target)
+        self._client.object_meta[(self._bucket, path)] = dict(file_options)
+        return SimpleNamespace(status_code=200, json=lambda: {"Key": f"{self._bucket}/{path}"})
+
+    def download(self, path: str, options=None) -> bytes:
+        _sleep(self._client.storage_latency, self._client.storage_jitter)
+        target = self._path(path)
+        if not os.path.exists(target):
+            raise Exception("Object not found (statusCode 404)")
+        with open(target, "rb") as fh:
+            return fh.read()
+
+    def list(self, path: Optional[str] = None, options: Optional[Dict] = None):
+        _sleep(self._client.storage_latency, self._client.storage_jitter)
+        folder = os.path.join(self._client.storage_root, self._bucket, path or "")
+        search = (options or {}).get("search", "")
+        if not os.path.isdir(folder):
+            return []
+        prefix = f"{path}/" if path else ""
+        return [
+            {
+                "name": name,
+                "metadata": {
+                    "size": os.path.getsize(os.path.join(folder, name)),
+                    "mimetype": self._client.object_meta.get((self._bucket, prefix + name), {})
+                        .get("content-type", "text/plain;charset=UTF-8"),
+                },
+            }
+            for name in sorted(os.listdir(folder))
+            if search in name and not name.startswith(".") and os.path.isfile(os.path.join(folder, name))
+        ][: (options or {}).get("limit", 100)]
+
+    def create_signed_upload_url(self, path: str) -> Dict[str, str]:
+        _sleep(self._client.storage_latency, self._client.storage_jitter)
+        token = uuid.uuid4().hex
+        return {
+            "signed_url": f"https://fake.supabase.local/storage/v1/object/upload/sign/{self._bucket}/{path}?token={token}",
+            "token": token,
+            "path": path,
+        }
+
+    def get_public_url(self, path: str, options=None) -> str:
+        return f"https://fake.supabase.local/storage/v1/object/public/{self._bucket}/{path}"
+
+
+class FakeStorage:
+    def __init__(self, client: "FakeSupabaseClient"):
+        self._client = client
+
+    def list_buckets(self):
+        _sleep(self._client.storage_latency, self._client.storage_jitter)
+        with self._client.lock:
+            return [SimpleNamespace(name=name, public=True) for name in self._client.buckets]
+
+    def create_bucket(self, name: str, public: bool = False, **kwargs):
+        _sleep(self._client.storage_latency, self._client.storage_jitter)
+        with self._client.lock:
+            self._client.buckets.add(name)
+        return {"name": name}
+
+    def update_bucket(self, name: str, public: bool = False, **kwargs):
+        return {"name": name}
+
+    def from_(self, bucket: str) -> FakeBucketApi:
+        return FakeBucketApi(self._client, bucket)
+
+
+class FakeAuth:
+    def get_user(self, token: str):
+        # Any non-empty token is accepted. The benchmark's tokens are JWTs and
+        # map to their `sub`; anything else maps to an ID derived from it, so
+        # repeated calls with the same token map to the same user.
+        import jwt
+
+        try:
+            user_id = jwt.decode(token, options={"verify_signature": False})["sub"]
+        except (jwt.PyJWTError, KeyError):
+            user_id = str(uuid.uuid5(uuid.NAMESPACE_URL, token))
+        return SimpleNamespace(user=SimpleNamespace(id=user_id, email=f"{user_id[:8]}@bench.local"))
+
+
+class FakeSupabaseClient:
+    """
+    Thread-safe in-memory stand-in for the supabase `Client`. Table rows live
+    in memory; storage objects are written to a temporary directory so they
+    do not inflate the RSS figures the harness reports.
+    """
+
+    def __init__(self, db_latency: float = 0.02, storage_latency: float = 0.05, jitter: float = 0.0):
+        self.db_latency = db_latency
+        self.db_jitter = jitter
+        self.storage_latency = storage_latency
+        self.storage_jitter = jitter
+        self.lock = threading.RLock()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {
+            "colorize_events_totals": [{"total_unique_users": 42, "total_memories": 1337}],
+        }
+        self.buckets = set()
+        self.object_meta: Dict = {}
+        self.storage_root = tempfile.mkdtemp(prefix="rangmantra-bench-")
+        self.storage = FakeStorage(self)
+        self.auth = FakeAuth()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def count_rows(self, table: str, **criteria) -> int:
+        with self.lock:
+            return sum(
+                1 for row in self.tables.get(table, [])
+                if all(row.get(k) == v for k, v in criteria.items())
+            )
+
+    def cleanup(self):
+        shutil.rmtree(self.storage_root, ignore_errors=True)
@@ -0,0 +1,396 @@
+"""
+Load-testing harness for the RangMantra API.
+
+Runs the FastAPI `app` from `app/main.py` in-process against fake Gemini and
+Supabase backends (see `benchmarks/fakes.py`), drives the colorize and stats
+endpoints at a configurable concurrency and reports p50/p95/p99 latency,
+throughput and peak RSS per endpoint.
+
+Usage:
+    python -m benchmarks.load_test --requests 200 --concurrency 16
+    python -m benchmarks.load_test --output baseline.json
+    python -m benchmarks.load_test --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fakes import FakeGenerativeModel, FakeSupabaseClient, make_png
+
+# Access tokens are signed with this so the rate limiter can verify them
+BENCH_JWT_SECRET = "rangmantra-bench-secret"
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+]
+
+
+# ────────── measurement helpers ──────────
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, falling back to the peak if /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Samples RSS on an interval so each phase can report its own peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            self.peak = max(self.peak, current_rss_bytes())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self.peak = current_rss_bytes()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> int:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.peak = max(self.peak, current_rss_bytes())
+        return self.peak
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+@dataclass
+class PhaseResult:
+    endpoint: str
+    requests: int
+    concurrency: int
+    duration_s: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    errors: int
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    peak_rss_mb: float = 0.0
+    jobs_drain_s: Optional[float] = None
+
+
+# ────────── scenarios ──────────
+
+def make_access_token(user_id: str) -> str:
+    """A Supabase-style access token for `user_id`, signed with BENCH_JWT_SECRET."""
+    import jwt
+
+    return jwt.encode({"sub": user_id, "aud": "authenticated", "role": "authenticated"},
+                      BENCH_JWT_SECRET, algorithm="HS256")
+
+
+class BenchContext:
+    def __init__(self, image_bytes: bytes, users: int, fake_db: FakeSupabaseClient):
+        self.image_bytes = image_bytes
+        self.fake_db = fake_db
+        self.user_ids = [str(uuid.uuid4()) for _ in range(users)]
+        self.tokens = {user_id: make_access_token(user_id) for user_id in self.user_ids}
+        self.request_ids: List[str] = []
+
+    def user_id(self) -> str:
+        return random.choice(self.user_ids)
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "user-agent": random.choice(USER_AGENTS),
+            "authorization": f"Bearer {self.tokens[self.user_id()]}",
+        }
+
+
+async def scenario_upload(client, ctx: BenchContext):
+    response = await client.post(
+        "/api/v1/colorize/upload",
+        files={"file": ("photo.png", ctx.image_bytes, "image/png")},
+        data={"user_id": ctx.user_id()},
+        headers=ctx.headers(),
+    )
+    if response.status_code == 200:
+        ctx.request_ids.append(response.json()["request_id"])
+    return response
+
+
+async def scenario_signed_upload(client, ctx: BenchContext):
+    response = await client.post(
+        "/api/v1/colorize/upload-url",
+        data={"user_id": ctx.user_id()},
+        headers=ctx.headers(),
+    )
+    if response.status_code != 200:
+        return response
+    signed = response.json()
+
+    # Stands in for the client's direct PUT to the signed URL
+    await asyncio.get_event_loop().run_in_executor(
+        None,
+        lambda: ctx.fake_db.storage.from_("original-images").upload(signed["path"], ctx.image_bytes, {"content-type": "image/png"}),
+    )
+
+    response = await client.post(
+        f"/api/v1/colorize/upload/{signed['request_id']}/complete",
+        headers=ctx.headers(),
+    )
+    if response.status_code == 200:
+        ctx.request_ids.append(signed["request_id"])
+    return response
+
+
+async def scenario_status(client, ctx: BenchContext):
+    request_id = random.choice(ctx.request_ids) if ctx.request_ids else str(uuid.uuid4())
+    return await client.get(f"/api/v1/colorize/status/{request_id}", headers=ctx.headers())
+
+
+async def scenario_history(client, ctx: BenchContext):
+    return await client.get(
+        "/api/v1/colorize/history",
+        params={"limit": 20},
+        headers=ctx.headers(),
+    )
+
+
+async def scenario_ephemeral(client, ctx: BenchContext):
+    return await client.post(
+        "/api/v1/colorize/ephemeral",
+        files={"file": ("photo.png", ctx.image_bytes, "image/png")},
+        headers=ctx.headers(),
+    )
+
+
+async def scenario_stats(client, ctx: BenchContext):
+    return await client.get("/api/v1/stats/", headers=ctx.headers())
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "upload": scenario_upload,
+    "signed_upload": scenario_signed_upload,
+    "status": scenario_status,
+    "history": scenario_history,
+    "ephemeral": scenario_ephemeral,
+    "stats": scenario_stats,
+}
+
+
+# ────────── driver ──────────
+
+async def run_phase(client, ctx: BenchContext, name: str, total: int, concurrency: int) -> PhaseResult:
+    scenario = SCENARIOS[name]
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                code = str(response.status_code)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception as e:
+                code = type(e).__name__
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    sampler = RssSampler()
+    sampler.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    peak = await sampler.stop()
+
+    ordered = sorted(latencies)
+    return PhaseResult(
+        endpoint=name,
+        requests=len(latencies),
+        concurrency=concurrency,
+        duration_s=round(duration, 3),
+        rps=round(len(latencies) / duration, 2) if duration else 0.0,
+        p50_ms=round(percentile(ordered, 50) * 1000, 2),
+        p95_ms=round(percentile(ordered, 95) * 1000, 2),
+        p99_ms=round(percentile(ordered, 99) * 1000, 2),
+        max_ms=round((ordered[-1] if ordered else 0.0) * 1000, 2),
+        errors=errors,
+        status_codes=status_codes,
+        peak_rss_mb=round(peak / (1024 * 1024), 1),
+    )
+
+
+async def wait_for_jobs(fake_db: FakeSupabaseClient, timeout: float) -> Optional[float]:
+    """Wait until no colorize request is left queued or processing; returns the time it took."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        pending = sum(fake_db.count_rows("colorize_requests", status=s) for s in ("queued", "processing"))
+        if pending == 0:
+            return round(time.perf_counter() - started, 3)
+        await asyncio.sleep(0.1)
+    return None
+
+
+def install_fakes(args) -> FakeSupabaseClient:
+    """
+    Swap the Gemini model class and the Supabase client factory for the fakes.
+    Must run before `app.main` is imported.
+    """
+    os.environ["SUPABASE_JWT_SECRET_RM"] = BENCH_JWT_SECRET
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if args.rate_limit else "false"
+
+    import google.generativeai as genai
+    import supabase
+
+    FakeGenerativeModel.configure(args.model_latency, args.model_jitter, args.payload_kb, args.model_throttle_rate)
+    genai.GenerativeModel = FakeGenerativeModel
+    genai.configure = lambda *a, **kw: None
+
+    fake_db = FakeSupabaseClient(
+        db_latency=args.db_latency,
+        storage_latency=args.storage_latency,
+        jitter=args.db_jitter,
+    )
+    supabase.create_client = lambda *a, **kw: fake_db
+    return fake_db
+
+
+async def run(args) -> List[PhaseResult]:
+    import httpx
+
+    fake_db = install_fakes(args)
+    from app.main import app
+
+    ctx = BenchContext(make_png(args.image_size, args.image_size, "L"), users=args.users, fake_db=fake_db)
+    results: List[PhaseResult] = []
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for name in args.endpoints:
+                    result = await run_phase(client, ctx, name, args.requests, args.concurrency)
+                    if name in ("upload", "signed_upload"):
+                        result.jobs_drain_s = await wait_for_jobs(fake_db, args.drain_timeout)
+                    results.append(result)
+    finally:
+        fake_db.cleanup()
+    return results
+
+
+# ────────── reporting ──────────
+
+def print_report(results: List[PhaseResult], baseline: Optional[Dict[str, dict]] = None):
+    header = f"{'endpoint':<14} {'reqs':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7} {'rss MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.endpoint:<14} {r.requests:>6} {r.rps:>9.2f} {r.p50_ms:>9.2f} {r.p95_ms:>9.2f} "
+            f"{r.p99_ms:>9.2f} {r.max_ms:>9.2f} {r.errors:>7} {r.peak_rss_mb:>8.1f}"
+        )
+        if r.jobs_drain_s is not None:
+            print(f"{'':<14} background jobs drained in {r.jobs_drain_s:.2f}s")
+        if r.errors:
+            print(f"{'':<14} status codes: {r.status_codes}")
+
+    if not baseline:
+        return
+    print()
+    print("Change vs baseline (negative latency / positive rps is better):")
+    for r in results:
+        base = baseline.get(r.endpoint)
+        if not base:
+            continue
+        deltas = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+            before = base.get(key) or 0.0
+            after = getattr(r, key)
+            pct = ((after - before) / before * 100.0) if before else 0.0
+            deltas.append(f"{key} {pct:+.1f}%")
+        print(f"  {r.endpoint:<14} " + ", ".join(deltas))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the RangMantra API against fake backends")
+    parser.add_argument("--endpoints", default="upload,signed_upload,status,history,ephemeral,stats",
+                        help="Comma separated phases to run, in order (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per endpoint")
+    parser.add_argument("--users", type=int, default=50, help="Distinct user ids to spread requests across")
+    parser.add_argument("--image-size", type=int, default=1024, help="Side length of the uploaded grayscale image")
+    parser.add_argument("--model-latency", type=float, default=1.0, help="Seconds the fake model takes per call")
+    parser.add_argument("--model-jitter", type=float, default=0.0, help="Uniform +/- jitter on model latency")
+    parser.add_argument("--model-throttle-rate", type=float, default=0.0,
+                        help="Fraction of fake model calls that fail with a 429")
+    parser.add_argument("--payload-kb", type=int, default=1024, help="Approximate size of the fake model's PNG")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Seconds per fake table call")
+    parser.add_argument("--storage-latency", type=float, default=0.05, help="Seconds per fake storage call")
+    parser.add_argument("--db-jitter", type=float, default=0.0, help="Uniform +/- jitter on Supabase latency")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Keep per-client rate limiting on (RATE_LIMIT_* settings); off by default")
+    parser.add_argument("--drain-timeout", type=float, default=600.0,
+                        help="Max seconds to wait for background colorizations after the upload phase")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    args = parser.parse_args(argv)
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in args.endpoints if e not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = {r["endpoint"]: r for r in json.load(fh)["results"]}
+
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+                       "results": [asdict(r) for r in results]}, fh, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
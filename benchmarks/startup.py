@@ -0,0 +1,109 @@
+"""
+Startup-time benchmark for the RangMantra API.
+
+Imports `app.main` in a fresh interpreter with `-X importtime` and reports
+the wall-clock import time together with the cumulative import cost of each
+top-level package and of every `app.*` module. No credentials or network
+access are needed, so it also catches code that builds clients at import.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROBE = (
+    "import time; _t = time.perf_counter(); import {module}; "
+    "print('WALL', time.perf_counter() - _t)"
+)
+
+
+def measure_once(module: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """
+    Import `module` in a subprocess
+
+    Returns:
+        Tuple of the wall-clock import time in seconds and the parsed
+        importtime rows as (module, depth, self_us, cumulative_us)
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    wall = next(float(line.split()[1]) for line in proc.stdout.splitlines() if line.startswith("WALL"))
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return wall, rows
+
+
+def summarize(rows: List[Tuple[str, int, int, int]]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Cumulative cost of each top-level package, and of each `app.*` module
+    """
+    packages: Dict[str, int] = {}
+    app_modules: Dict[str, int] = {}
+    for name, depth, _, cumulative in rows:
+        if name.startswith("app.") or name == "app":
+            app_modules[name] = cumulative
+        elif "." not in name:
+            # importtime lists each module once, nested under whichever
+            # import loaded it first, so this is the package's full cost
+            packages[name] = cumulative
+    return packages, app_modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import cost of the RangMantra app")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=12, help="How many third-party packages to list")
+    args = parser.parse_args(argv)
+
+    walls = []
+    package_runs: Dict[str, List[int]] = {}
+    app_runs: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        wall, rows = measure_once(args.module)
+        walls.append(wall)
+        packages, app_modules = summarize(rows)
+        for name, us in packages.items():
+            package_runs.setdefault(name, []).append(us)
+        for name, us in app_modules.items():
+            app_runs.setdefault(name, []).append(us)
+
+    print(f"import {args.module}: median {statistics.median(walls) * 1000:.1f} ms "
+          f"(min {min(walls) * 1000:.1f}, max {max(walls) * 1000:.1f}) over {args.runs} runs")
+
+    print(f"\nTop-level packages by cumulative import time (median ms):")
+    ranked = sorted(
+        ((name, statistics.median(us)) for name, us in package_runs.items() if name != "app"),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    for name, us in ranked[: args.top]:
+        print(f"  {name:<32} {us / 1000:>9.1f}")
+
+    print(f"\napp modules by cumulative import time (median ms):")
+    for name, us in sorted(app_runs.items(), key=lambda item: statistics.median(item[1]), reverse=True):
+        print(f"  {name:<40} {statistics.median(us) / 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()